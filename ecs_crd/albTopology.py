@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class AlbTopology:
+    """snapshot of the listeners and rules of an application load balancer
+
+    Each AWS listing is paginated and loaded once, then queried in memory.
+    """
+
+    def __init__(self, client, load_balancer_arn):
+        """initializes a new instance of the class"""
+        self.client = client
+        self.load_balancer_arn = load_balancer_arn
+        self._listeners = None
+        self._rules = {}
+
+    @property
+    def listeners(self):
+        """listeners of the load balancer"""
+        if self._listeners is None:
+            self._listeners = self._list('describe_listeners', 'Listeners', LoadBalancerArn=self.load_balancer_arn)
+        return self._listeners
+
+    def find_listener(self, port):
+        """return the listener of the port, None if not found"""
+        return next((x for x in self.listeners if int(x['Port']) == int(port)), None)
+
+    def rules(self, listener_arn):
+        """rules of the listener"""
+        if listener_arn not in self._rules:
+            self._rules[listener_arn] = self._list('describe_rules', 'Rules', ListenerArn=listener_arn)
+        return self._rules[listener_arn]
+
+    def priorities(self, listener_arn):
+        """sorted priorities of the rules of the listener (the default rule has no priority)"""
+        return sorted(int(x['Priority']) for x in self.rules(listener_arn) if str(x['Priority']).isdigit())
+
+    def _list(self, operation, key, **kwargs):
+        result = []
+        marker = None
+        while True:
+            if marker:
+                response = getattr(self.client, operation)(Marker=marker, **kwargs)
+            else:
+                response = getattr(self.client, operation)(**kwargs)
+            result.extend(response[key])
+            marker = response.get('NextMarker')
+            if not marker:
+                break
+        return result
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import math
+import time
+import datetime
 import boto3
 
+from ecs_crd.canaryReleaseInfos import PollingInfos
+from ecs_crd.canaryAnalysis import CanaryAnalysis
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
+from ecs_crd.route53WeightChanges import Route53WeightChanges
 from ecs_crd.rollbackChangeRoute53WeightsStep import RollbackChangeRoute53WeightsStep
 from ecs_crd.updateCanaryReleaseInfoStep import UpdateCanaryReleaseInfoStep
 
 
-class ChangeRoute53WeightsStep(CanaryReleaseDeployStep):
+class ChangeRoute53WeightsStep(Route53WeightChanges, CanaryReleaseDeployStep):
 
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
@@ -40,55 +46,67 @@ class ChangeRoute53WeightsStep(CanaryReleaseDeployStep):
         self._log_information(key='Dns weight green', value=f"{green_weight}%")
         self.logger.info('')
 
-        client = boto3.client('route53')
-        for item in self.infos.fqdn:
-            self._change_weights_by_fqdn(item, client, blue_weight, green_weight)
+        client = self._client('route53')
+        change_ids = self._change_weights_by_hosted_zone(
+            client, self.infos.fqdn, blue_weight, green_weight,
+            'Alter Route53 records sets for canary blue-green deployment')
 
         if (green_weight == 100):
             self.infos.strategy_infos.clear()
         self.logger.info('')
-        self._wait(strategy.wait, "Changing DNS's Weights")
-
-    def _change_weights_by_fqdn(self, fqdn, client, blue_weight, green_weight):
-        self._log_information(key='Fqdn', value=fqdn.name)
-        client.change_resource_record_sets(
-            HostedZoneId=fqdn.hosted_zone_id,
-            ChangeBatch={
-                'Comment': 'Alter Route53 records sets for canary blue-green deployment',
-                'Changes': [
-                    {
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': f"{fqdn.name}.",
-                            'Type': 'CNAME',
-                            'SetIdentifier': self.infos.blue_infos.canary_release,
-                            'Weight': blue_weight,
-                            'TTL': 60,
-                            'ResourceRecords': [
-                                {
-                                    'Value': self.infos.blue_infos.alb_dns
-                                },
-                            ]
-                        },
-                    },
-                    {
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': f"{fqdn.name}.",
-                            'Type': 'CNAME',
-                            'SetIdentifier': self.infos.green_infos.canary_release,
-                            'Weight': green_weight,
-                            'TTL': 60,
-                            'ResourceRecords': [
-                                {
-                                    'Value': self.infos.green_infos.alb_dns
-                                },
-                            ]
-                        },
-                    }
-                ]
-            }
-        )
+        self._wait_changes_insync(client, change_ids)
+        if self._is_canary_analyzed(blue_weight, green_weight):
+            self._analyze_canary(strategy.wait)
+        else:
+            self._wait(strategy.wait, "Changing DNS's Weights")
+
+    def _is_canary_analyzed(self, blue_weight, green_weight):
+        """the analysis needs traffic on both releases"""
+        return bool(self.infos.analysis_infos and blue_weight and green_weight and self.infos.blue_infos.stack_name)
+
+    def _analyze_canary(self, wait):
+        """compare the metrics of green with blue in place of the wait, raise an error if green must be rolled back"""
+        analysis_infos = self.infos.analysis_infos
+        # the analysis needs at least one period of metrics
+        wait = max(wait, analysis_infos.period)
+        analysis = CanaryAnalysis(self._client('cloudwatch'), analysis_infos)
+        targets = {
+            'green': self._find_metric_targets(self.infos.green_infos.alb_arn, self.infos.green_infos.stack_name),
+            'blue': self._find_metric_targets(self.infos.blue_infos.alb_arn, self.infos.blue_infos.stack_name)
+        }
+        # the metrics window starts when the weights are propagated (INSYNC), never before
+        insync_at = datetime.datetime.now(datetime.timezone.utc)
+        insync_clock = time.monotonic()
+        # the analysis is done every interval during the wait, green is promoted as soon as its metrics are good
+        polling_infos = PollingInfos(
+            interval=analysis_infos.interval,
+            backoff=1,
+            max_interval=analysis_infos.interval,
+            jitter=0,
+            timeout=wait)
+        def decide():
+            elapsed = time.monotonic() - insync_clock
+            if elapsed < analysis_infos.period:
+                return None
+            end = insync_at + datetime.timedelta(seconds=elapsed)
+            decision, reason, metrics = analysis.analyze(targets, end=end, start=insync_at)
+            self._log_information(key='Canary analysis', value=f'{decision} ({reason})')
+            return None if decision == CanaryAnalysis.HOLD else decision
+        decision = self._poll(decide, 'Canary analysis in progress', polling_infos, raise_on_timeout=False)
+        if decision == CanaryAnalysis.ROLLBACK:
+            raise ValueError('The canary analysis of the green release failed.')
+        if not decision:
+            if analysis_infos.on_no_decision != CanaryAnalysis.PROMOTE:
+                raise ValueError(f'No canary analysis decision after {self._second_to_string(wait)}, the green release is rolled back.')
+            self.logger.warning(f'No canary analysis decision after {self._second_to_string(wait)}, the green release is promoted (on_no_decision: promote).')
+
+    def _find_metric_targets(self, load_balancer_arn, stack_name):
+        """return the (load balancer arn, target group arn) of the target groups of the stack"""
+        stack = self.infos.stack_inventory.find(stack_name)
+        if not stack:
+            raise ValueError(f'The cloudformation stack {stack_name} is not found for the canary analysis.')
+        outputs = filter(lambda x: x['OutputKey'].startswith('TargetGroup'), stack.get('Outputs', []))
+        return [(load_balancer_arn, x['OutputValue']) for x in outputs]
 
     def _consume_strategy(self):
         """consume the first strategy of the canary release's definition"""
@@ -105,46 +123,74 @@ class CheckGreenHealthStep(CanaryReleaseDeployStep):
 
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
-        self._nb_max_initial_test = 4
-        self._nb_initial_test = 1
         super().__init__(infos, 'Check Health Green LoadBalancer', logger)
+        health_infos = self.infos.health_infos
+        self.polling_infos = PollingInfos(
+            interval=health_infos.interval,
+            backoff=health_infos.backoff,
+            max_interval=health_infos.max_interval,
+            jitter=self.infos.polling_infos.jitter,
+            timeout=health_infos.timeout)
+        self.min_healthy_ratio = health_infos.min_healthy_ratio
+        self.consecutive_healthy = health_infos.consecutive_healthy
+        self._healthy_observations = 0
 
     def _find_health_checks(self):
-        """return list of state of health check load balancer"""
+        """return the health of the targets of each target group (the target groups are checked concurrently)"""
+        client = self._client('elbv2')
+        target_groups = self._find_target_group_arns()
+        responses = self._run_concurrently([
+            lambda x=x: client.describe_target_health(TargetGroupArn=x['OutputValue']) for x in target_groups])
         result = []
-        client = boto3.client('elbv2', region_name=self.infos.region)
-        targetGroupArns = self._find_target_group_arns()
-        for e in targetGroupArns:
-            response = client.describe_target_health(TargetGroupArn=e['OutputValue'])
-            state = "UNKNOWN"
-            if response['TargetHealthDescriptions']:
-                state = response['TargetHealthDescriptions'][0]['TargetHealth']['State'].upper()
+        for target_group, response in zip(target_groups, responses):
+            health = self._to_target_group_health(response['TargetHealthDescriptions'])
             self.logger.info('')
-            self._log_information(key='Target Group', value=e['OutputKey'][:-3])
-            self._log_information(key='Arn', value=e['OutputValue'])
-            self._log_information(key='State', value=state)
-            result.append(state)
+            self._log_information(key='Target Group', value=target_group['OutputKey'][:-3])
+            self._log_information(key='Arn', value=target_group['OutputValue'])
+            self._log_information(
+                key='State',
+                value=f"{health['healthy']}/{health['total']} healthy, {health['unhealthy']} unhealthy, {health['draining']} draining")
+            result.append(health)
         return result
 
-    def _is_all_full_states(self, health_checks, states):
-        if not states:
+    def _to_target_group_health(self, target_health_descriptions):
+        """count the targets by state"""
+        result = {'total': len(target_health_descriptions), 'healthy': 0, 'unhealthy': 0, 'draining': 0}
+        for item in target_health_descriptions:
+            state = item['TargetHealth']['State'].lower()
+            if state in ['healthy', 'unhealthy', 'draining']:
+                result[state] += 1
+        return result
+
+    def _is_healthy(self):
+        health_checks = self._find_health_checks()
+        healthy = sum(x['healthy'] for x in health_checks)
+        targets = sum(x['total'] - x['draining'] for x in health_checks)
+        self.logger.info('')
+        self._log_information(key='Healthy', value=f'{healthy}/{targets} ({healthy / targets if targets else 0:.0%})')
+        return bool(health_checks) and all(self._is_target_group_healthy(x) for x in health_checks)
+
+    def _is_target_group_healthy(self, health):
+        """the targets leaving the target group (draining) are ignored, the min healthy ratio of the desired instances must be healthy"""
+        targets = health['total'] - health['draining']
+        if not targets or health['healthy'] / targets < self.min_healthy_ratio:
             return False
-        return len(list(filter(lambda x: x in states, health_checks))) == len(health_checks)
+        return not self.infos.scale_infos or health['healthy'] >= math.ceil(self.infos.scale_infos.desired * self.min_healthy_ratio)
+
+    def _is_converged(self):
+        """green is healthy for consecutive healthy observations"""
+        if self._is_healthy():
+            self._healthy_observations += 1
+        else:
+            self._healthy_observations = 0
+        if self.consecutive_healthy > 1:
+            self._log_information(key='Observations', value=f'{self._healthy_observations}/{self.consecutive_healthy}')
+        return self._healthy_observations >= self.consecutive_healthy
 
     def _on_execute(self):
         """operation containing the processing performed by this step"""
         try:
-            while True:
-                health_checks = self._find_health_checks()
-                is_full_healthy = self._is_all_full_states(health_checks, ['HEALTHY'])
-                if is_full_healthy:
-                    break
-                else:
-                    if self._nb_initial_test < self._nb_max_initial_test:
-                        self._wait(15, f'Waiting for service to start (attempts {self._nb_initial_test}/{self._nb_max_initial_test})')
-                        self._nb_initial_test += 1
-                        continue
-                    raise ValueError(f'{"Invalid state for Green TargetGroup"}')
+            self._poll(self._is_converged, 'Waiting for service to start', self.polling_infos)
 
             # all health check is ok
             if self.infos.strategy_infos:
@@ -159,7 +205,11 @@ class CheckGreenHealthStep(CanaryReleaseDeployStep):
             return RollbackChangeRoute53WeightsStep(self.infos, self.logger)
 
     def _find_target_group_arns(self):
-        client = boto3.client('cloudformation', region_name=self.infos.region)
-        response = client.describe_stacks(StackName=self.infos.green_infos.stack_name)
-        return filter(lambda x: x['OutputKey'].startswith('TargetGroup'), response['Stacks'][0]['Outputs'])
+        """return the target groups outputs of the green stack, found once"""
+        if self.infos.green_infos.target_group_arns is None:
+            client = self._client('cloudformation')
+            response = client.describe_stacks(StackName=self.infos.green_infos.stack_name)
+            self.infos.green_infos.target_group_arns = list(
+                filter(lambda x: x['OutputKey'].startswith('TargetGroup'), response['Stacks'][0]['Outputs']))
+        return self.infos.green_infos.target_group_arns
 
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import boto3
+
+from botocore.config import Config
+
+
+class AwsClientRegistry:
+    """boto3 clients and resources shared by all the steps of a deployment, keyed by service and region"""
+
+    def __init__(self, max_pool_connections=25, max_attempts=10):
+        """initializes a new instance of the class"""
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={'max_attempts': max_attempts})
+        self._lock = threading.Lock()
+        self._session = None
+        self._clients = {}
+        self._resources = {}
+
+    def client(self, service_name, region_name=None):
+        """return the client of the service (clients are thread safe)"""
+        key = (service_name, region_name)
+        result = self._clients.get(key)
+        if not result:
+            with self._lock:
+                result = self._clients.get(key)
+                if not result:
+                    result = self._get_session().client(service_name, region_name=region_name, config=self.config)
+                    self._clients[key] = result
+        return result
+
+    def resource(self, service_name, region_name=None):
+        """return the resource of the service (resources must not be shared between threads)"""
+        key = (service_name, region_name)
+        result = self._resources.get(key)
+        if not result:
+            with self._lock:
+                result = self._resources.get(key)
+                if not result:
+                    result = self._get_session().resource(service_name, region_name=region_name, config=self.config)
+                    self._resources[key] = result
+        return result
+
+    def _get_session(self):
+        # the boto3 session is not thread safe, it is only used under the lock
+        if not self._session:
+            self._session = boto3.session.Session()
+        return self._session
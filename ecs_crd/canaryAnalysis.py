@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+
+
+class CanaryAnalysis:
+    """compare the AWS CloudWatch metrics of the green and blue target groups to promote, hold or rollback green
+
+    The 5xx rate (HTTPCode_Target_5XX_Count / RequestCount) and the p99 of
+    TargetResponseTime of green are compared with the blue baseline over
+    the same window.
+    """
+
+    PROMOTE = 'promote'
+    HOLD = 'hold'
+    ROLLBACK = 'rollback'
+
+    def __init__(self, client, analysis_infos):
+        """initializes a new instance of the class"""
+        self.client = client
+        self.analysis_infos = analysis_infos
+
+    def analyze(self, targets, end=None, start=None):
+        """return the decision, its reason and the metrics by release for the window ending at end (and starting at start at the earliest)"""
+        if not end:
+            end = datetime.datetime.now(datetime.timezone.utc)
+        window_start = end - datetime.timedelta(seconds=self.analysis_infos.window)
+        start = max(start, window_start) if start else window_start
+        metrics = self.fetch(targets, start, end)
+        decision, reason = self.decide(metrics['green'], metrics['blue'])
+        return decision, reason, metrics
+
+    def fetch(self, targets, start, end):
+        """return the metrics by release, targets are the (load balancer arn, target group arn) by release"""
+        queries = []
+        for release, items in targets.items():
+            for i, (load_balancer_arn, target_group_arn) in enumerate(items):
+                dimensions = [
+                    {'Name': 'LoadBalancer', 'Value': load_balancer_arn.split(':loadbalancer/')[-1]},
+                    {'Name': 'TargetGroup', 'Value': target_group_arn.split(':')[-1]}
+                ]
+                queries.append(self._to_query(f'{release}_requests_{i}', 'RequestCount', 'Sum', dimensions))
+                queries.append(self._to_query(f'{release}_errors_{i}', 'HTTPCode_Target_5XX_Count', 'Sum', dimensions))
+                queries.append(self._to_query(f'{release}_latency_{i}', 'TargetResponseTime', 'p99', dimensions))
+        values = self._get_metric_data(queries, start, end)
+        result = {}
+        for release in targets.keys():
+            latencies = [v for k, items in values.items() if k.startswith(f'{release}_latency_') for v in items]
+            result[release] = {
+                'requests': sum(v for k, items in values.items() if k.startswith(f'{release}_requests_') for v in items),
+                'errors': sum(v for k, items in values.items() if k.startswith(f'{release}_errors_') for v in items),
+                # the highest p99 of the periods and target groups (conservative)
+                'latency_p99': max(latencies) if latencies else None
+            }
+        return result
+
+    def decide(self, green, blue):
+        """return the decision and its reason"""
+        if green['requests'] < self.analysis_infos.min_requests:
+            return self.HOLD, f'not enough requests for green ({int(green["requests"])} < {self.analysis_infos.min_requests})'
+        green_error_rate = green['errors'] / green['requests']
+        blue_error_rate = blue['errors'] / blue['requests'] if blue['requests'] else 0
+        if green_error_rate - blue_error_rate > self.analysis_infos.max_error_rate_increase:
+            return self.ROLLBACK, f'5xx rate {green_error_rate:.2%} for green, {blue_error_rate:.2%} for blue'
+        if green['latency_p99'] and blue['latency_p99']:
+            if green['latency_p99'] > blue['latency_p99'] * self.analysis_infos.max_latency_ratio:
+                return self.ROLLBACK, f'p99 latency {green["latency_p99"]:.3f}s for green, {blue["latency_p99"]:.3f}s for blue'
+        return self.PROMOTE, f'5xx rate {green_error_rate:.2%} for green, {blue_error_rate:.2%} for blue'
+
+    def _to_query(self, id, metric_name, stat, dimensions):
+        return {
+            'Id': id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': 'AWS/ApplicationELB',
+                    'MetricName': metric_name,
+                    'Dimensions': dimensions
+                },
+                'Period': self.analysis_infos.period,
+                'Stat': stat
+            },
+            'ReturnData': True
+        }
+
+    def _get_metric_data(self, queries, start, end):
+        """return the values by query id (get_metric_data accepts 500 queries by call)"""
+        result = {}
+        for i in range(0, len(queries), 500):
+            next_token = None
+            while True:
+                kwargs = {'MetricDataQueries': queries[i:i+500], 'StartTime': start, 'EndTime': end}
+                if next_token:
+                    kwargs['NextToken'] = next_token
+                response = self.client.get_metric_data(**kwargs)
+                for item in response['MetricDataResults']:
+                    result.setdefault(item['Id'], []).extend(item['Values'])
+                next_token = response.get('NextToken')
+                if not next_token:
+                    break
+        return result
@@ -3,15 +3,26 @@
 
 from abc import ABC, abstractmethod
 import logging
-import yaml
 import time
 import datetime
 import re
 import boto3
 import hashlib
+import random
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.canaryReleaseInfos import PollingInfos
+from ecs_crd.placeholderTemplate import compile_template
 
 class CanaryReleaseDeployStep(ABC):
 
+    # an interrupted deployment can be resumed from this step (see ecs-crd resume), the
+    # rollback steps included. the prepare steps only build the templates in memory and
+    # are not resumable.
+    resumable = True
+
     def __init__(self, infos, title, logger, with_end_log=True, with_start_log=True):
         self.infos = infos
         self.title = title
@@ -19,16 +30,28 @@ class CanaryReleaseDeployStep(ABC):
         self.with_start_log = with_start_log
         self.with_end_log = with_end_log
         self.previous_exit_code = self.infos.exit_code
+        self._template_signature = None
+        self._template_context_values = None
         self.configuration = self._load_configuration()
 
     def execute(self):
+        self._checkpoint_step()
         if self.with_start_log:
             self._log_start()
         result = self._on_execute()
+        if self.infos.exit_code != self.previous_exit_code and result is not None:
+            # the failure is recorded at once, with the first step of the rollback chain
+            result._checkpoint_step()
         if self.with_end_log:
             self._log_end()
         return result
 
+    def _checkpoint_step(self):
+        """record the step reached by the deployment, with its exit code and error"""
+        if self.resumable:
+            self.infos.last_step = type(self).__name__
+            self.infos.save(force=True)
+
     def _log_start(self):
         self.logger.info(''.ljust(50, '-'))
         self.logger.info(f'Step: {self.title}')
@@ -99,73 +122,84 @@ class CanaryReleaseDeployStep(ABC):
         if not target_property:
             target_property = self._to_pascal_case(source_property)
         
-        if default and source_property not in source:
-            source[source_property] = default
-        
+        # the configuration is shared by all the steps, the default is not written back in the source
+        found = source_property in source or bool(default)
+        value = source[source_property] if source_property in source else default
+
         suffix_message = '.'
         if parent_property:
             suffix_message = f' for {parent_property}.'
 
-        if source_property in source:
+        if found:
             if type:
-                if isinstance(source[source_property], type):
-                    target[target_property] = source[source_property]
+                if isinstance(value, type):
+                    target[target_property] = value
                 else:
-                    raise ValueError(f'{target_property}: {source[source_property]} is not valid{suffix_message}')
+                    raise ValueError(f'{target_property}: {value} is not valid{suffix_message}')
             else:
-                target[target_property] = self._bind_data(source[source_property])
+                target[target_property] = self._bind_data(value)
             if pattern:
                 val = re.match(pattern, target[target_property])
                 if not val:
-                    raise ValueError(f'{target_property}: {source[source_property]} is not valid{suffix_message}')
+                    raise ValueError(f'{target_property}: {value} is not valid{suffix_message}')
             self._log_information(key = ('- ' if multi else '' )+target_property, value=target[target_property] , indent=indent)
         else:
             if required:
                 raise ValueError(f'{target_property} is required{suffix_message}')
 
-    def _bind_data_fqdn(self, source):
-        try:
-            result = source
-            match = re.match('.*({{fqdn(\\[(\\d)\\])*}}).*',source)
-            while match != None:
-                if match.groups()[2]:
-                    index = int(match.groups()[2])
-                    pattern = str(match.groups()[0])
-                    result = result.replace(pattern, self.infos.fqdn[index].name)
-                else:
-                    result = result.replace(str(match.groups()[0]),self.infos.fqdn[0].name)
-                match = re.match('.*({{fqdn(\\[(\\d)\\])*}}).*',result)
-            return result
-        except:
-            raise ValueError('Invalid Fqdn template :{}'.format(source))
-
     def _bind_data(self, source):
         if not source:
             return None
-        data = source
-        if self.infos.account_id:
-            data = data.replace('{{account_id}}', self.infos.account_id)
-        if self.infos.environment:
-            data = data.replace('{{environment}}', self.infos.environment)
-        if self.infos.region:
-            data = data.replace('{{region}}', self.infos.region)
-        if self.infos.project:
-            data = data.replace('{{project}}', self.infos.project)
-        if self.infos.service_name:
-            data = data.replace('{{name}}', self.infos.service_name)
-        if self.infos.service_version:
-            data = data.replace('{{version}}', self.infos.service_version)
-        if self.infos.external_ip:
-            data = data.replace('{{external_ip}}', self.infos.external_ip)
-        data = self._bind_data_fqdn(data)
-        return data
+        return compile_template(source).render(self._template_context())
+
+    def _template_context(self):
+        """values of the templates, built again only when the deployment informations change"""
+        signature = (
+            self.infos.account_id,
+            self.infos.environment,
+            self.infos.region,
+            self.infos.project,
+            self.infos.service_name,
+            self.infos.service_version,
+            self.infos.external_ip,
+            tuple(x.name for x in self.infos.fqdn)
+        )
+        if self._template_signature != signature:
+            self._template_context_values = {
+                'account_id': signature[0],
+                'environment': signature[1],
+                'region': signature[2],
+                'project': signature[3],
+                'name': signature[4],
+                'version': signature[5],
+                'external_ip': signature[6],
+                'fqdn': signature[7]
+            }
+            self._template_signature = signature
+        return self._template_context_values
 
     def _load_configuration(self):
-        """load configuration"""
-        if self.infos.configuration_file:
-            with open(self.infos.configuration_file, 'r') as stream:
-                return yaml.safe_load(stream)
-        return None
+        """load configuration (once per run, shared by all steps)"""
+        if self.infos.configuration is None and self.infos.configuration_file:
+            self.infos.configuration = DeploymentConfiguration.load(self.infos.configuration_file)
+        return self.infos.configuration
+
+    def _run_concurrently(self, calls, max_workers=8):
+        """run the calls on a thread pool and return their results in the order of the calls"""
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+            futures = [executor.submit(call) for call in calls]
+        # all the calls are finished, the first error (in the order of the calls) is raised
+        return [future.result() for future in futures]
+
+    def _client(self, service_name):
+        """return the shared AWS client of the service for the deployment region"""
+        return self.infos.aws_clients.client(service_name, self.infos.region)
+
+    def _resource(self, service_name):
+        """return the shared AWS resource of the service for the deployment region"""
+        return self.infos.aws_clients.resource(service_name, self.infos.region)
 
     def _to_snake_case(self, text):
         """convert to snake case"""
@@ -186,12 +220,30 @@ class CanaryReleaseDeployStep(ABC):
         pass
 
     def _wait(self, wait, label, tick=5):
-        t = 0
-        while (t < wait):
-            time.sleep(tick)
-            t += tick
-            r = self._second_to_string(t)
-            self.logger.info(f'{label} ... [{r} elapsed]')
+        """pause the process during the wait time"""
+        polling_infos = PollingInfos(interval=tick, backoff=1, max_interval=tick, jitter=0, timeout=wait)
+        self._poll(lambda: False, label, polling_infos, raise_on_timeout=False)
+
+    def _poll(self, condition, label, polling_infos=None, raise_on_timeout=True):
+        """call the condition until it returns a result, with an exponential backoff between the calls"""
+        if not polling_infos:
+            polling_infos = self.infos.polling_infos
+        start = time.monotonic()
+        interval = polling_infos.interval
+        while True:
+            result = condition()
+            if result:
+                return result
+            remaining = polling_infos.timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                if raise_on_timeout:
+                    raise ValueError(f'{label}: timeout after {self._second_to_string(polling_infos.timeout)}.')
+                return result
+            delay = min(interval, polling_infos.max_interval)
+            delay *= 1 + random.uniform(-polling_infos.jitter, polling_infos.jitter)
+            time.sleep(max(0, min(delay, remaining)))
+            interval *= polling_infos.backoff
+            self.logger.info(f'{label} ... [{self._second_to_string(time.monotonic() - start)} elapsed]')
 
     def _second_to_string(self, seconds):
         tm = int(seconds)
@@ -9,8 +9,13 @@ import hashlib
 
 #Attention au try/catch IOError
 
-from ecs_crd.defaultJSONEncoder import DefaultJSONEncoder
+from ecs_crd.checkpointWriter import CheckpointWriter
+from ecs_crd.awsClientRegistry import AwsClientRegistry
+from ecs_crd.stackInventory import StackInventory
+from ecs_crd.albTopology import AlbTopology
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
 from ecs_crd.versionInfos import VersionInfos
+from ecs_crd.cloudFormationTemplateRegistry import template_registry
 
 class ScaleInfos:
     def __init__(self, **kwargs):
@@ -21,6 +26,31 @@ class ScaleInfos:
             if k in keys:
                 self.__dict__[k] = v
 
+class PollingInfos:
+    def __init__(self, **kwargs):
+        self.interval = 5
+        self.backoff = 1.5
+        self.max_interval = 30
+        self.jitter = 0.1
+        self.timeout = 3600
+        keys = self.__dict__.keys()
+        for k, v in kwargs.items():
+            if k in keys:
+                self.__dict__[k] = v
+
+class HealthInfos:
+    def __init__(self, **kwargs):
+        self.min_healthy_ratio = 1.0
+        self.consecutive_healthy = 1
+        self.interval = 5
+        self.backoff = 1.5
+        self.max_interval = 15
+        self.timeout = 60
+        keys = self.__dict__.keys()
+        for k, v in kwargs.items():
+            if k in keys:
+                self.__dict__[k] = v
+
 class StrategyInfos:
     def __init__(self, **kwargs):
         self.weight = None
@@ -30,6 +60,20 @@ class StrategyInfos:
             if k in keys:
                 self.__dict__[k] = v
 
+class AnalysisInfos:
+    def __init__(self, **kwargs):
+        self.window = 300
+        self.period = 60
+        self.interval = 60
+        self.on_no_decision = 'rollback'
+        self.min_requests = 100
+        self.max_error_rate_increase = 0.01
+        self.max_latency_ratio = 1.5
+        keys = self.__dict__.keys()
+        for k, v in kwargs.items():
+            if k in keys:
+                self.__dict__[k] = v
+
 class PolicyInfos:
     def __init__(self, **kwargs):
         self.name = None
@@ -58,6 +102,7 @@ class ReleaseInfos(StackInfos):
         self.alb_dns = None
         self.alb_hosted_zone_id = None
         self.canary_release = None
+        self.target_group_arns = None
         keys = self.__dict__.keys()
         for k, v in kwargs.items():
             if k in keys:
@@ -89,8 +134,6 @@ class ListenerRuleInfos:
     def __init__(self,  **kwargs):
         self.listener_arn = None
         self.configuration = None
-        self.current_priority = 1
-        self.listener_arn = None
         keys = self.__dict__.keys()
         for k, v in kwargs.items():
             if k in keys:
@@ -128,8 +171,12 @@ class CanaryReleaseInfos(object):
         self.hosted_zone_id = None
         self.vpc_id = None
         self.scale_infos = None
+        self.polling_infos = PollingInfos()
+        self.health_infos = HealthInfos()
         self.configuration_file = None
+        self.configuration = None
         self.strategy_infos = []
+        self.analysis_infos = None
         self.init_infos = StackInfos()
         self.init_infos.stack = self._load_init_cloud_formation_template()
         self.green_infos = ReleaseInfos()
@@ -139,6 +186,12 @@ class CanaryReleaseInfos(object):
         self.secrets_infos = None
         self.elected_release = None
         self.ecs_crd_version = None
+        self.checkpoint_format = 'json'
+        self.last_step = None
+        self._checkpoint = None
+        self._aws_clients = None
+        self._stack_inventory = None
+        self._alb_topologies = {}
 
         keys = self.__dict__.keys()
         for k, v in kwargs.items():
@@ -146,33 +199,87 @@ class CanaryReleaseInfos(object):
                 self.__dict__[k] = v
 
     def _load_green_cloud_formation_template(self):
-        result = None
-        filename = os.path.dirname(os.path.realpath(__file__))+'/cfn_green_release_deploy.json'
-        with open(filename, 'r') as file:
-            data = file.read()
-            result = json.loads(data)
-        result['Parameters']['Environment']['Default'] = self.environment
-        result['Parameters']['Region']['Default'] = self.region
-        return result
+        return self._load_cloud_formation_template('green')
 
     def _load_init_cloud_formation_template(self):
-        result = None
-        filename = os.path.dirname(os.path.realpath(__file__))+'/cfn_init_release_deploy.json'
-        with open(filename, 'r') as file:
-            data = file.read()
-            result = json.loads(data)
+        return self._load_cloud_formation_template('init')
+
+    def _load_cloud_formation_template(self, name):
+        result = template_registry.get(name)
         result['Parameters']['Environment']['Default'] = self.environment
         result['Parameters']['Region']['Default'] = self.region
         return result
 
-    def save(self):
-        cache_id = f".deploy-cache/{self.id}"
-        if not os.path.exists('.deploy-cache'):
-            os.mkdir('.deploy-cache')
-        if not os.path.exists(f"{cache_id}"):
-            os.mkdir(f".deploy-cache/{self.id}")
-        with open(f"{cache_id}/deploy_info.json", 'w') as file:
-            file.write(json.dumps(self, cls=DefaultJSONEncoder, indent=4))
+    @property
+    def aws_clients(self):
+        """AWS clients shared by all the steps of the deployment"""
+        if not self._aws_clients:
+            self._aws_clients = AwsClientRegistry()
+        return self._aws_clients
+
+    @property
+    def stack_inventory(self):
+        """cloud formation stacks described during the deployment"""
+        if not self._stack_inventory:
+            self._stack_inventory = StackInventory(self.aws_clients.client('cloudformation', self.region))
+        return self._stack_inventory
+
+    def alb_topology(self, load_balancer_arn):
+        """listeners and rules of the load balancer, loaded once during the deployment"""
+        if load_balancer_arn not in self._alb_topologies:
+            self._alb_topologies[load_balancer_arn] = AlbTopology(
+                self.aws_clients.client('elbv2', self.region), load_balancer_arn)
+        return self._alb_topologies[load_balancer_arn]
+
+    def save(self, force=False):
+        """checkpoint the deployment informations in .deploy-cache/<id>"""
+        self._checkpoint_writer().write(self._checkpoint_state(), force)
+
+    def flush(self):
+        """write the checkpoint delayed by save"""
+        self._checkpoint_writer().flush()
+
+    def _checkpoint_writer(self):
+        if not self._checkpoint:
+            self._checkpoint = CheckpointWriter(
+                directory=f'.deploy-cache/{self.id}',
+                format=self.checkpoint_format,
+                min_interval=2)
+        return self._checkpoint
+
+    def _checkpoint_state(self):
+        result = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        if self.exit_exception is not None:
+            # the error is kept as its message, an exception is not serializable
+            result['exit_exception'] = str(self.exit_exception)
+        return result
+
+    @classmethod
+    def load(cls, id):
+        """rebuild the deployment informations from the checkpoint .deploy-cache/<id>"""
+        data = CheckpointWriter.read(f'.deploy-cache/{id}')
+        result = cls(**data)
+        result.exit_exception = data.get('exit_exception')
+        result.init_infos = StackInfos(**data['init_infos'])
+        result.green_infos = ReleaseInfos(**data['green_infos'])
+        if data.get('blue_infos'):
+            result.blue_infos = ReleaseInfos(**data['blue_infos'])
+        if data.get('scale_infos'):
+            result.scale_infos = ScaleInfos(**data['scale_infos'])
+        if data.get('polling_infos'):
+            result.polling_infos = PollingInfos(**data['polling_infos'])
+        if data.get('health_infos'):
+            result.health_infos = HealthInfos(**data['health_infos'])
+        if data.get('analysis_infos'):
+            result.analysis_infos = AnalysisInfos(**data['analysis_infos'])
+        if data.get('secret_infos'):
+            result.secret_infos = SecretInfos(**data['secret_infos'])
+        if data.get('configuration') is not None:
+            result.configuration = DeploymentConfiguration(data['configuration'], result.configuration_file)
+        result.fqdn = [FqdnInfos(**x) for x in data.get('fqdn', [])]
+        result.strategy_infos = [StrategyInfos(**x) for x in data.get('strategy_infos', [])]
+        result.listener_rules_infos = [ListenerRuleInfos(**x) for x in data.get('listener_rules_infos', [])]
+        return result
 
     def get_hash(self):
         data = f'{self.canary_group}#{self.service_name}#{self.environment}#{self.region}'
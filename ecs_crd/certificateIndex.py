@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class CertificateIndex:
+    """index of the AWS ACM certificates by domain name (primary domain and subject alternative names)"""
+
+    def __init__(self, certificates):
+        """initializes a new instance of the class"""
+        self._certificates = {}
+        for item in certificates:
+            names = [item['DomainName']] + item.get('SubjectAlternativeNameSummaries', [])
+            for name in names:
+                certificates_by_name = self._certificates.setdefault(name.lower(), [])
+                if item not in certificates_by_name:
+                    certificates_by_name.append(item)
+
+    @classmethod
+    def load(cls, client):
+        """build the index from all the certificates of the region (list_certificates)"""
+        certificates = []
+        next_token = None
+        while True:
+            if next_token:
+                response = client.list_certificates(NextToken=next_token)
+            else:
+                response = client.list_certificates()
+            certificates.extend(response['CertificateSummaryList'])
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+        return cls(certificates)
+
+    def find(self, domain_name):
+        """return the certificates of the domain name, the wildcard certificates are used when there is no exact match"""
+        name = domain_name.strip('.').lower()
+        result = self._certificates.get(name)
+        if not result and '.' in name:
+            result = self._certificates.get('*.' + name.split('.', 1)[1])
+        return list(result or [])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import threading
+
+from ecs_crd.defaultJSONEncoder import DefaultJSONEncoder
+
+
+class CheckpointWriter:
+    """incremental and debounced writer of the deployment checkpoint
+
+    Each top-level property is serialized on its own and compared with the
+    last written state: nothing is written when nothing changed.
+
+    formats:
+     - json  : full snapshot in deploy_info.json, replaced atomically (rename)
+     - jsonl : deploy_info.jsonl, a first full snapshot followed by one line
+               per change containing only the modified properties
+    """
+
+    FORMATS = ['json', 'jsonl']
+
+    def __init__(self, directory, format='json', min_interval=0):
+        """initializes a new instance of the class"""
+        if format not in self.FORMATS:
+            raise ValueError(f'{format} is not valid checkpoint format.')
+        self.directory = directory
+        self.format = format
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._fragments = None
+        self._pending = None
+        self._last_write = None
+
+    @property
+    def filename(self):
+        return os.path.join(self.directory, f'deploy_info.{self.format}')
+
+    def write(self, state, force=False):
+        """write the state (dict of top-level properties) if it changed since the last write"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_write is not None and now - self._last_write < self.min_interval:
+                # debounced, written by the next write or by flush
+                self._pending = state
+                return False
+            return self._write(state, now)
+
+    def flush(self):
+        """write the pending state if any"""
+        with self._lock:
+            if self._pending is None:
+                return False
+            return self._write(self._pending, time.monotonic())
+
+    def _write(self, state, now):
+        self._pending = None
+        fragments = {k: json.dumps(v, cls=DefaultJSONEncoder, sort_keys=True) for k, v in state.items()}
+        if fragments == self._fragments:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        if self.format == 'json' or self._fragments is None:
+            self._replace(self._to_snapshot(fragments))
+        else:
+            self._append(self._to_delta(self._fragments, fragments))
+        self._fragments = fragments
+        self._last_write = now
+        return True
+
+    def _to_snapshot(self, fragments):
+        items = ','.join(f'{json.dumps(k)}:{v}' for k, v in fragments.items())
+        return '{' + items + '}'
+
+    def _to_delta(self, previous, fragments):
+        changes = ','.join(f'{json.dumps(k)}:{v}' for k, v in fragments.items() if previous.get(k) != v)
+        removed = [k for k in previous.keys() if k not in fragments]
+        return '{"set":{' + changes + '},"unset":' + json.dumps(removed) + '}'
+
+    def _replace(self, data):
+        """write the file atomically, a crash never leaves a truncated checkpoint"""
+        tmp = f'{self.filename}.tmp'
+        with open(tmp, 'w') as file:
+            file.write(data)
+            file.write('\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.filename)
+
+    def _append(self, data):
+        with open(self.filename, 'a') as file:
+            file.write(data)
+            file.write('\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    @classmethod
+    def read(cls, directory):
+        """read the last state written in the directory"""
+        filename = os.path.join(directory, 'deploy_info.jsonl')
+        if os.path.isfile(filename):
+            return cls._read_jsonl(filename)
+        filename = os.path.join(directory, 'deploy_info.json')
+        if os.path.isfile(filename):
+            with open(filename, 'r') as file:
+                return json.loads(file.read())
+        raise ValueError(f'No checkpoint found in {directory}.')
+
+    @classmethod
+    def _read_jsonl(cls, filename):
+        result = None
+        with open(filename, 'r') as file:
+            for line in file:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # torn last line (crash during append)
+                    break
+                if result is None:
+                    result = data
+                    continue
+                result.update(data['set'])
+                for k in data['unset']:
+                    result.pop(k, None)
+        if result is None:
+            raise ValueError(f'{filename} is empty.')
+        return result
@@ -7,8 +7,10 @@ import logging
 import boto3
 import sys
 
+from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.prepareDeploymentGlobalParametersStep import PrepareDeploymentGlobalParametersStep
 from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
 from ecs_crd.versionInfos import VersionInfos
 
 # Hum un global meriterait d'etre en MAJ
@@ -74,18 +76,19 @@ def main():
 @click.option('-d', '--configuration-dir', required=False, help='directory to find the deployment configuration file.')
 @click.option('--verbose', is_flag=True, default=False, help='activate verbose log.')
 @click.option('--log-file', required=False, help='output log file result.')
+@click.option('--checkpoint-format', type=click.Choice(['json', 'jsonl']), default='json', help='format of the deployment checkpoint (.deploy-cache).', show_default=True)
 def dry_run(
         environment,
         region,
         configuration_file,
         configuration_dir,
         verbose,
-        log_file):
-    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file)
+        log_file,
+        checkpoint_format):
+    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file, checkpoint_format)
     canary_infos.action = 'validate'
     canary_step = PrepareDeploymentGlobalParametersStep(canary_infos, logger)
-    while (canary_step):
-        canary_step = canary_step.execute()
+    _run_steps(canary_infos, canary_step)
     sys.exit(canary_infos.exit_code)
 
 @main.command(help='deploy the ECS service')
@@ -95,21 +98,22 @@ def dry_run(
 @click.option('-d', '--configuration-dir', required=False, help='directory to find the deployment configuration file.')
 @click.option('--verbose', is_flag=True, default=False, help='activate verbose log.')
 @click.option('--log-file', required=False, help='output log file result.')
+@click.option('--checkpoint-format', type=click.Choice(['json', 'jsonl']), default='json', help='format of the deployment checkpoint (.deploy-cache).', show_default=True)
 def deploy(
         environment,
         region,
         configuration_file,
         configuration_dir,
         verbose,
-        log_file):
-    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file)
+        log_file,
+        checkpoint_format):
+    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file, checkpoint_format)
     canary_infos.action = 'deploy'
     canary_step = PrepareDeploymentGlobalParametersStep(canary_infos, logger)
-    while (canary_step):
-        canary_step = canary_step.execute()
+    _run_steps(canary_infos, canary_step)
     sys.exit(canary_infos.exit_code)
 
-def _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file):
+def _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file, checkpoint_format):
     logger = _create_logger(verbose, log_file)
     parameters = Parameters(logger)
     parameters.environment = environment
@@ -121,7 +125,9 @@ def _common_action(environment, region, configuration_file, configuration_dir, v
         environment = parameters.environment,
         region = parameters.region,
         configuration_file = parameters.configuration_file,
-        ecs_crd_version = version_infos.version
+        configuration = DeploymentConfiguration.load(parameters.configuration_file),
+        ecs_crd_version = version_infos.version,
+        checkpoint_format = checkpoint_format
     )
     return logger, canary_infos
 
@@ -132,20 +138,75 @@ def _common_action(environment, region, configuration_file, configuration_dir, v
 @click.option('-d', '--configuration-dir', required=False, help='directory to find the deployment configuration file.')
 @click.option('--verbose', is_flag=True, default=False, help='activate verbose log.')
 @click.option('--log-file', required=False, help='output log file result.')
+@click.option('--checkpoint-format', type=click.Choice(['json', 'jsonl']), default='json', help='format of the deployment checkpoint (.deploy-cache).', show_default=True)
 def undeploy(
         environment,
         region,
         configuration_file,
         configuration_dir,
         verbose,
-        log_file):
-    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file)
+        log_file,
+        checkpoint_format):
+    logger, canary_infos = _common_action(environment, region, configuration_file, configuration_dir, verbose, log_file, checkpoint_format)
     canary_infos.action = 'undeploy'
     canary_step = PrepareDeploymentGlobalParametersStep(canary_infos, logger)
-    while (canary_step):
-        canary_step = canary_step.execute()
+    _run_steps(canary_infos, canary_step)
+    sys.exit(canary_infos.exit_code)
+
+@main.command(help='resume an interrupted deployment from its checkpoint')
+@click.option('--id', 'deploy_id', required=True, help='deployment ID to resume (see .deploy-cache directory).')
+@click.option('--verbose', is_flag=True, default=False, help='activate verbose log.')
+@click.option('--log-file', required=False, help='output log file result.')
+def resume(
+        deploy_id,
+        verbose,
+        log_file):
+    logger = _create_logger(verbose, log_file)
+    canary_infos = CanaryReleaseInfos.load(deploy_id)
+    if canary_infos.last_step == 'FinishDeploymentStep':
+        logger.info(f'The {canary_infos.action} {deploy_id} is already finished (exit code {canary_infos.exit_code}).')
+        sys.exit(canary_infos.exit_code)
+    canary_step = None
+    if canary_infos.last_step:
+        # a failed deployment (exit code != 0) is resumed in its rollback chain, never in the forward steps
+        canary_step = _find_step_class(canary_infos.last_step)(canary_infos, logger)
+    else:
+        # stopped during the preparation: restart from the beginning
+        canary_infos = CanaryReleaseInfos(
+            id = canary_infos.id,
+            action = canary_infos.action,
+            environment = canary_infos.environment,
+            region = canary_infos.region,
+            configuration_file = canary_infos.configuration_file,
+            configuration = canary_infos.configuration,
+            ecs_crd_version = version_infos.version,
+            checkpoint_format = canary_infos.checkpoint_format
+        )
+        canary_step = PrepareDeploymentGlobalParametersStep(canary_infos, logger)
+    logger.info(f'Resume {canary_infos.action} {deploy_id} from step {type(canary_step).__name__}')
+    _run_steps(canary_infos, canary_step)
     sys.exit(canary_infos.exit_code)
 
+def _run_steps(canary_infos, canary_step):
+    """run the step chain, the debounced checkpoint is written at the end of the run (also on error)"""
+    try:
+        while (canary_step):
+            canary_step = canary_step.execute()
+    finally:
+        canary_infos.flush()
+
+def _find_step_class(name, parent=CanaryReleaseDeployStep):
+    """find the step class by name"""
+    for step_class in parent.__subclasses__():
+        if step_class.__name__ == name:
+            return step_class
+        result = _find_step_class(name, step_class)
+        if result:
+            return result
+    if parent == CanaryReleaseDeployStep:
+        raise ValueError(f'Step {name} not found.')
+    return None
+
 @main.command(name='version', help='show CLI version')
 def version():
     version_infos = VersionInfos()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import json
+import threading
+
+
+class CloudFormationTemplateRegistry:
+    """process-wide registry of the cloud formation templates (cfn_<name>_release_deploy.json)"""
+
+    FILENAME_PATTERN = re.compile('^cfn_(.+)_release_deploy\\.json$')
+
+    def __init__(self):
+        """initializes a new instance of the class"""
+        self._lock = threading.Lock()
+        self._directories = [os.path.dirname(os.path.realpath(__file__))]
+        self._filenames = {}
+        self._templates = {}
+        self._scan(self._directories[0])
+
+    def register_directory(self, directory):
+        """register the template variants of a directory (they take precedence over the bundled templates)"""
+        if not os.path.isdir(directory):
+            raise ValueError(f'{directory} not exist.')
+        with self._lock:
+            self._directories.append(directory)
+            self._scan(directory)
+
+    def names(self):
+        """return the names of the registered templates"""
+        return sorted(self._filenames.keys())
+
+    def get(self, name):
+        """return a new copy of the template, free to be modified by the caller"""
+        return json.loads(self._master(name))
+
+    def _scan(self, directory):
+        for filename in sorted(os.listdir(directory)):
+            match = self.FILENAME_PATTERN.match(filename)
+            if match:
+                name = match.groups()[0]
+                self._filenames[name] = os.path.join(directory, filename)
+                # the master copy is read again on next use
+                self._templates.pop(name, None)
+
+    def _master(self, name):
+        """return the compact json text of the template, read and validated on first use"""
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    if name not in self._filenames:
+                        raise ValueError(f'Cloud formation template "{name}" not found.')
+                    with open(self._filenames[name], 'r') as file:
+                        # without indentation and spaces, the text is parsed faster by each get
+                        template = json.dumps(json.loads(file.read()), separators=(',', ':'))
+                    self._templates[name] = template
+        return template
+
+
+template_registry = CloudFormationTemplateRegistry()
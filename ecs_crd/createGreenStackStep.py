@@ -20,7 +20,6 @@ class CreateGreenStackStep(CreateStackStep):
             'Create Green Cloudformation Stack', 
             logger,
             infos.green_infos)
-        self.timer = 5
 
     def _on_success(self):
         return ScaleUpServiceStep(self.infos, self.logger)
@@ -8,6 +8,7 @@ import time
 from abc import ABC, abstractmethod
 from ecs_crd.defaultJSONEncoder import DefaultJSONEncoder
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
+from ecs_crd.stackEventsMonitor import StackEventsMonitor
 
 class CreateStackStep(CanaryReleaseDeployStep):
 
@@ -18,7 +19,6 @@ class CreateStackStep(CanaryReleaseDeployStep):
             title, 
             logger
         )
-        self.timer = 5
         self.stack_infos = stack_infos
 
     @abstractmethod
@@ -37,9 +37,10 @@ class CreateStackStep(CanaryReleaseDeployStep):
                                   value=self.stack_infos.stack_name)
             self.logger.info('')
             self.logger.info(f'Creating stack in progress ...')
-            client = boto3.client('cloudformation',
-                                  region_name=self.infos.region)
+            client = self._client('cloudformation')
             self._create_stack(client)
+            self.infos.stack_inventory.forget(self.stack_infos.stack_name)
+            self.infos.save(force=True)
             self._monitor(client)
             self.infos.save()
             return self._on_success()
@@ -51,29 +52,17 @@ class CreateStackStep(CanaryReleaseDeployStep):
 
     def _monitor(self, client):
         """pause the process and wait for the result of the cloud formation stack creation"""
-        wait = 0
-        while True:
-            wait += self.timer
-            w = self._second_to_string(wait)
-            self.logger.info('')
-            time.sleep(self.timer)
-            self.logger.info(f'Creating stack in progress ... [{w} elapsed]')
-            response = client.describe_stacks(StackName=self.stack_infos.stack_id)
-            stack = response['Stacks'][0]
-            response2 = client.list_stack_resources(StackName=self.stack_infos.stack_id)
-            for resource in response2['StackResourceSummaries']:
-                message = resource['LogicalResourceId'].ljust(40, '.') + \
-                          resource['ResourceStatus']
-                if 'ResourceStatusReason' in resource:
-                    message += f' ( {resource["ResourceStatusReason"]} )'
-                self.logger.info(message)
+        monitor = StackEventsMonitor(client, self.stack_infos.stack_id, self.logger)
+        self._poll(lambda: self._is_created(monitor), 'Creating stack in progress')
 
-            if stack['StackStatus'] == 'CREATE_IN_PROGRESS':
-                continue
-            elif stack['StackStatus'] == 'CREATE_COMPLETE':
-                break
-            else:
-                raise ValueError('Error creation green cloudformation stack')
+    def _is_created(self, monitor):
+        status = monitor.poll()
+        if status in [None, 'CREATE_IN_PROGRESS']:
+            return False
+        elif status == 'CREATE_COMPLETE':
+            return True
+        else:
+            raise ValueError('Error creation green cloudformation stack')
 
     def _create_stack(self, client):
         if self.stack_infos.stack_id:
@@ -5,4 +5,5 @@ from json import JSONEncoder
 
 class DefaultJSONEncoder(JSONEncoder):
     def default(self, o):
-        return o.__dict__
\ No newline at end of file
+        # private properties are runtime only, they are not serialized
+        return {k: v for k, v in o.__dict__.items() if not k.startswith('_')}
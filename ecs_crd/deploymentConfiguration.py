@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import yaml
+
+# use the libyaml parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError('The deployment configuration is read-only.')
+
+
+class _ReadOnlyDict(dict):
+    """dictionary of the configuration, it can not be changed once built"""
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+class _ReadOnlyList(list):
+    """list of the configuration, it can not be changed once built"""
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+
+def _freeze(value):
+    """read-only copy of the value"""
+    if isinstance(value, dict):
+        return _ReadOnlyDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _ReadOnlyList(_freeze(x) for x in value)
+    return value
+
+
+class DeploymentConfiguration(_ReadOnlyDict):
+    """deployment configuration (*.deploy.yml) parsed once and shared by all steps, it is read-only"""
+
+    def __init__(self, data=None, configuration_file=None):
+        """initializes a new instance of the class"""
+        super().__init__((k, _freeze(v)) for k, v in (data or {}).items())
+        self.configuration_file = configuration_file
+
+    @classmethod
+    def load(cls, configuration_file):
+        """load the deployment configuration file"""
+        with open(configuration_file, 'r') as stream:
+            data = yaml.load(stream, Loader=SafeLoader)
+        return cls(data, configuration_file)
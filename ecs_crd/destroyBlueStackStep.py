@@ -31,7 +31,7 @@ class DestroyBlueStackStep(DestroyStackStep):
    
     def _clean_route_53_record_sets(self):
         """remove CNAME in route 53"""
-        client = boto3.client('route53')
+        client = self._client('route53')
         client.change_resource_record_sets(
             HostedZoneId=self.infos.hosted_zone_id,
             ChangeBatch={
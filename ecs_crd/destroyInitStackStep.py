@@ -19,7 +19,7 @@ class DestroyInitStackStep(DestroyStackStep):
         )
 
     def _on_success(self):
-        client = boto3.client('route53')
+        client = self._client('route53')
         self._clean_route_53_record_sets(client)
         return SendNotificationBySnsStep(self.infos, self.logger)
         
@@ -36,7 +36,6 @@ class DestroyInitStackStep(DestroyStackStep):
 
     def _find_route_53_record_sets_by_hosted_zone_id(self, client, hosted_zone_id, start_record_name=None, start_record_type=None, start_record_identifier=None):
         result = {}
-        client = boto3.client('route53')
         response = None
         if start_record_name:
             if start_record_identifier:
@@ -62,8 +61,8 @@ class DestroyInitStackStep(DestroyStackStep):
                 result[item.name]['HostedZoneId'] = item.hosted_zone_id
 
         if 'IsTruncated' in response and bool(response['IsTruncated']):
-            items = self._find_route_53_record_sets(client, hosted_zone_id, response['NextRecordName'], response['NextRecordType'], response['NextRecordIdentifier'] if 'NextRecordIdentifier' in response else None )
-            for k, v in items:
+            items = self._find_route_53_record_sets_by_hosted_zone_id(client, hosted_zone_id, response['NextRecordName'], response['NextRecordType'], response['NextRecordIdentifier'] if 'NextRecordIdentifier' in response else None )
+            for k, v in items.items():
                 result[k] = v
         return result 
 
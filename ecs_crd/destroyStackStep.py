@@ -6,6 +6,7 @@ import time
 from abc import ABC, abstractmethod
 
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
+from ecs_crd.stackEventsMonitor import StackEventsMonitor
 
 class DestroyStackStep(CanaryReleaseDeployStep):
 
@@ -16,16 +17,18 @@ class DestroyStackStep(CanaryReleaseDeployStep):
             title, 
             logger
         )
-        self.timer = 5
         self.stack_infos = stack_infos
 
     def _on_execute(self):
         """operation containing the processing performed by this step"""
         try:
             if self.stack_infos.stack_id:
-                client = boto3.client('cloudformation', region_name=self.infos.region)
+                client = self._client('cloudformation')
+                monitor = StackEventsMonitor(client, self.stack_infos.stack_id, self.logger)
+                monitor.mark()
                 self._destroy_stack(client)
-                self._monitor(client)
+                self.infos.stack_inventory.forget(self.stack_infos.stack_name)
+                self._monitor(monitor)
             else:
                 self.logger.info('Not destruction stack (reason: the stack not exist).')
             self.stack_infos.stack_id = None   
@@ -49,28 +52,16 @@ class DestroyStackStep(CanaryReleaseDeployStep):
         """destroys the cloud formation stack"""
         client.delete_stack(StackName=self.stack_infos.stack_id)
 
-    def _monitor(self, client):
+    def _monitor(self, monitor):
         """pause the process and wait for the result of the cloud formation stack deletion"""
-        wait = 0
-        while True:
-            wait += self.timer
-            w = self._second_to_string(wait)
-            self.logger.info('')
-            time.sleep(self.timer)
-            self.logger.info(f'Deleting stack in progress ... [{w} elapsed]')
-            response = client.describe_stacks(StackName=self.stack_infos.stack_id)
-            stack = response['Stacks'][0]
-            response2 = client.list_stack_resources(StackName=self.stack_infos.stack_id)
-            for resource in response2['StackResourceSummaries']:
-                message = resource['LogicalResourceId'].ljust(40, '.') + resource['ResourceStatus']
-                if 'ResourceStatusReason' in resource:
-                    message += f' ( {resource["ResourceStatusReason"]} )'
-                self.logger.info(message)
+        self._poll(lambda: self._is_deleted(monitor), 'Deleting stack in progress')
 
-            if stack['StackStatus'] == 'DELETE_IN_PROGRESS':
-                continue
-            else:
-                if stack['StackStatus'] == 'DELETE_COMPLETE':
-                    break
-                else:
-                    raise ValueError('Error deletion cloudformation stack')
\ No newline at end of file
+    def _is_deleted(self, monitor):
+        status = monitor.stack_status
+        if status not in ['DELETE_COMPLETE', 'DELETE_FAILED']:
+            status = monitor.poll()
+        if status == 'DELETE_COMPLETE':
+            return True
+        elif status == 'DELETE_FAILED':
+            raise ValueError('Error deletion cloudformation stack')
+        return False
@@ -22,4 +22,5 @@ class FinishDeploymentStep(CanaryReleaseDeployStep):
             self.logger.info('Result      : FAILED')
             self.logger.info(f'Exit code   : {self.infos.exit_code}')
             self.logger.info(f'Exit error  : {self.infos.exit_exception}')
+        self.infos.save(force=True)
         return None
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class HostedZoneIndex:
+    """index of the AWS Route53 hosted zones by name, used to find the zone of a fqdn"""
+
+    def __init__(self, hosted_zones):
+        """initializes a new instance of the class"""
+        self._zones = {}
+        for item in hosted_zones:
+            # the first zone wins when several zones have the same name
+            self._zones.setdefault(item['Name'].strip('.').lower(), item)
+
+    @classmethod
+    def load(cls, client):
+        """build the index from all the hosted zones of the account (list_hosted_zones_by_name)"""
+        hosted_zones = []
+        kwargs = {}
+        while True:
+            response = client.list_hosted_zones_by_name(**kwargs)
+            hosted_zones.extend(response['HostedZones'])
+            if not response.get('IsTruncated'):
+                break
+            kwargs = {'DNSName': response['NextDNSName'], 'HostedZoneId': response['NextHostedZoneId']}
+        return cls(hosted_zones)
+
+    def find(self, fqdn):
+        """return the hosted zone with the longest name matching the fqdn, None if not found"""
+        labels = fqdn.strip('.').lower().split('.')
+        for i in range(len(labels)):
+            item = self._zones.get('.'.join(labels[i:]))
+            if item:
+                return item
+        return None
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+
+
+class ListenerRulePriorityAllocator:
+    """allocate the priorities of the listener rules in the lowest free gaps of a listener
+
+    The used priorities are kept in a sorted list, the allocation only
+    depends on them so repeated runs allocate the same priorities.
+    """
+
+    def __init__(self, used=None, min_priority=3, max_priority=50000):
+        """initializes a new instance of the class"""
+        self.min_priority = min_priority
+        self.max_priority = max_priority
+        self._used = sorted(set(int(x) for x in (used or [])))
+
+    @property
+    def used(self):
+        """sorted used priorities"""
+        return list(self._used)
+
+    def use(self, priority):
+        """mark the priority as used"""
+        priority = int(priority)
+        index = bisect.bisect_left(self._used, priority)
+        if index == len(self._used) or self._used[index] != priority:
+            self._used.insert(index, priority)
+
+    def allocate(self):
+        """return the lowest free priority and mark it as used"""
+        return self.reserve_range(1)[0]
+
+    def reserve_range(self, count):
+        """return the lowest range of count contiguous free priorities and mark them as used"""
+        if count <= 0:
+            return []
+        start = self.min_priority
+        for priority in self._used[bisect.bisect_left(self._used, start):]:
+            if priority - start >= count:
+                break
+            start = priority + 1
+        if start + count - 1 > self.max_priority:
+            raise ValueError(f'There are not {count} free listener rule priorities.')
+        result = list(range(start, start + count))
+        for priority in result:
+            self.use(priority)
+        return result
+
+    def fragmentation(self):
+        """ratio of free priorities below the highest used priority (0 when the priorities are packed)"""
+        used = self._used[bisect.bisect_left(self._used, self.min_priority):]
+        if not used:
+            return 0.0
+        span = used[-1] - self.min_priority + 1
+        return (span - len(used)) / span
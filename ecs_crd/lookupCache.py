@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+
+class LookupCache:
+    """thread safe memoization of the AWS lookups, keyed by the lookup and its scope (account, region, ...)
+
+    The factory of a key is called at most once at a time, a failed lookup
+    is not cached.
+    """
+
+    def __init__(self):
+        """initializes a new instance of the class"""
+        self._lock = threading.Lock()
+        self._values = {}
+        self._key_locks = {}
+
+    def get(self, key, factory):
+        """return the value of the key, computed by the factory on the first call"""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            value = factory()
+            with self._lock:
+                self._values[key] = value
+            return value
+
+    def invalidate(self, key):
+        """forget the value of the key"""
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        """forget all the values"""
+        with self._lock:
+            self._values.clear()
+
+
+lookup_cache = LookupCache()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import functools
+
+PLACEHOLDER_PATTERN = re.compile(r'{{([A-Za-z_][A-Za-z0-9_]*)(?:\[(\d+)\])?}}')
+
+
+class PlaceholderTemplate:
+    """configuration string with {{name}} or {{fqdn[index]}} placeholders, tokenized once"""
+
+    def __init__(self, source):
+        """initializes a new instance of the class"""
+        self.source = source
+        # literal strings and (name, index, placeholder) tuples
+        self.tokens = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                self.tokens.append(source[position:match.start()])
+            index = match.group(2)
+            self.tokens.append((match.group(1), int(index) if index is not None else None, match.group(0)))
+            position = match.end()
+        if position < len(source):
+            self.tokens.append(source[position:])
+        self.has_placeholders = any(not isinstance(x, str) for x in self.tokens)
+
+    def render(self, context):
+        """replace the placeholders by the values of the context, the placeholders without value are left in place"""
+        if not self.has_placeholders:
+            return self.source
+        result = []
+        for token in self.tokens:
+            if isinstance(token, str):
+                result.append(token)
+                continue
+            name, index, placeholder = token
+            if name not in context:
+                raise ValueError(f'Unknown template {placeholder} in : {self.source}')
+            value = context[name]
+            if isinstance(value, (list, tuple)):
+                try:
+                    result.append(value[index or 0])
+                except IndexError:
+                    raise ValueError('Invalid Fqdn template :{}'.format(self.source))
+            elif index is not None:
+                raise ValueError(f'Invalid template {placeholder} in : {self.source}')
+            elif value is None:
+                result.append(placeholder)
+            else:
+                result.append(str(value))
+        return ''.join(result)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(source):
+    """return the compiled template of the source, cached by source"""
+    return PlaceholderTemplate(source)
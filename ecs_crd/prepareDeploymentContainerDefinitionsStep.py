@@ -1,23 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import boto3
 
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.canaryReleaseInfos import ScaleInfos
 from ecs_crd.canaryReleaseInfos import SecretInfos
+from ecs_crd.lookupCache import lookup_cache
 from ecs_crd.prepareDeploymentServiceDefinitionStep import PrepareDeploymentServiceDefinitionStep
 from ecs_crd.updateCanaryReleaseInfoStep import UpdateCanaryReleaseInfoStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
+DEFAULT_CONTAINER_IMAGE = '{{account_id}}.dkr.ecr.{{region}}.amazonaws.com/{{name}}:{{version}}'
 
 class PrepareDeploymentContainerDefinitionsStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(
             infos, f'Prepare {infos.action} ( Container definitions )', logger)
+        # digest of the AWS ECR images by (repository, tag)
+        self._image_digests = {}
 
     def _process_container_name(self, source, target):
         """update the name informations for the current container"""
@@ -38,14 +43,19 @@ class PrepareDeploymentContainerDefinitionsStep(CanaryReleaseDeployStep):
             target=target,
             source_property='image',
             parent_property='Service.Container',
-            default='{{account_id}}.dkr.ecr.{{region}}.amazonaws.com/{{name}}:{{version}}',
+            default=DEFAULT_CONTAINER_IMAGE,
             indent=3
         )
         # check exist container image
         if self._is_container_image_from_ecr(source, target):
-            if not self._exist_container_image_from_ecr(source, target):
+            digest = self._find_container_image_digest(target['Image'])
+            if not digest:
                 raise ValueError(
                     f'The container image {target["Image"]} is unknown in AWS ECR registry.')
+            if str(source.get('pin_image_digest', False)).lower().strip() == 'true':
+                repository, tag = self._parse_ecr_image(target['Image'])
+                target['Image'] = target['Image'].split('/')[0] + f'/{repository}@{digest}'
+                self._log_information(key='Image digest', value=digest, indent=3)
 
     def _process_container_cpu(self, source, target):
         """update the cpu informations for the current container"""
@@ -251,20 +261,68 @@ class PrepareDeploymentContainerDefinitionsStep(CanaryReleaseDeployStep):
     def _is_container_image_from_ecr(self, item, container):
         return container['Image'].startswith(self._bind_data('{{account_id}}.dkr.ecr.{{region}}.amazonaws.com/'))
 
-    def _exist_container_image_from_ecr(self, item, container):
-        client = boto3.client('ecr', region_name=self.infos.region)
+    def _parse_ecr_image(self, image):
+        """return the repository and the tag of the AWS ECR image"""
+        path = image.split('/', 1)[1]
+        repository, separator, tag = path.rpartition(':')
+        if not separator or '/' in tag:
+            return path, 'latest'
+        return repository, tag
+
+    def _prefetch_container_images(self):
+        """find the digests of all the AWS ECR images, with one call by repository"""
+        tags = {}
+        for source in self.configuration['service']['containers']:
+            image = self._bind_data(source.get('image', DEFAULT_CONTAINER_IMAGE))
+            if self._is_container_image_from_ecr(source, {'Image': image}):
+                repository, tag = self._parse_ecr_image(image)
+                if (repository, tag) not in self._image_digests:
+                    tags.setdefault(repository, set()).add(tag)
+        repositories = sorted(tags.keys())
+        results = self._run_concurrently(
+            [lambda x=x: self._describe_repository_images(x, sorted(tags[x])) for x in repositories])
+        for repository, digests in zip(repositories, results):
+            for tag, digest in digests.items():
+                self._image_digests[(repository, tag)] = digest
+
+    def _describe_repository_images(self, repository, tags):
+        """return the digests by tag of the images of the AWS ECR repository"""
+        client = self._client('ecr')
         try:
-            data = container['Image'].split('/')
-            registry = data[0]
-            data = data[1].split(':')
-            repository = data[0]
-            tag = data[1]
             response = client.describe_images(
-                repositoryName=repository, imageIds=[{"imageTag": tag}])
-            return len(response["imageDetails"]) == 1
+                repositoryName=repository, imageIds=[{'imageTag': x} for x in tags])
+            result = {}
+            for item in response['imageDetails']:
+                for tag in item.get('imageTags', []):
+                    if tag in tags:
+                        result[tag] = item['imageDigest']
+            return result
+        except client.exceptions.ImageNotFoundException:
+            # at least one tag is unknown, each tag is checked on its own
+            return {x: self._describe_image_digest(repository, x) for x in tags}
         except Exception as e:
+            # the images are checked again when the containers are processed
             self.logger.error(e)
-            return False
+            return {}
+
+    def _describe_image_digest(self, repository, tag):
+        """return the digest of the AWS ECR image, None if the image does not exist"""
+        client = self._client('ecr')
+        try:
+            response = client.describe_images(
+                repositoryName=repository, imageIds=[{'imageTag': tag}])
+            if len(response['imageDetails']) == 1:
+                return response['imageDetails'][0]['imageDigest']
+        except Exception as e:
+            self.logger.error(e)
+        return None
+
+    def _find_container_image_digest(self, image):
+        """return the digest of the AWS ECR image, None if the image does not exist"""
+        key = self._parse_ecr_image(image)
+        if key not in self._image_digests:
+            self._image_digests[key] = self._describe_image_digest(*key)
+        return self._image_digests[key]
 
     def _process_container_privileged(self, item, container):
         """update the privileged informations for the current container"""
@@ -428,6 +486,7 @@ class PrepareDeploymentContainerDefinitionsStep(CanaryReleaseDeployStep):
         """operation containing the processing performed by this step"""
         try:
             self.infos.secret_infos = self._find_secrets_task_informations()
+            self._prefetch_container_images()
             cfn = self.infos.green_infos.stack['Resources']['TaskDefinition']['Properties']['ContainerDefinitions']
             for source in self.configuration['service']['containers']:
                 target = {}
@@ -479,41 +538,48 @@ class PrepareDeploymentContainerDefinitionsStep(CanaryReleaseDeployStep):
 
     def _find_secrets_task_informations(self):
         """find secret task information for vault resolution in excution task role."""
-        result = None
-        o = []
-
+        secret_ids = []
         for container_infos in self.configuration['service']['containers']:
-            if 'secrets' in container_infos:
-                for item in container_infos['secrets']:
-                    format = self._bind_data(str(item)).replace('\'', '"')
-                    j = json.loads(format)
-                    o.append(j)
+            for item in container_infos.get('secrets', []):
+                for v in item.values():
+                    secret_id = self._bind_data(str(v))
+                    if secret_id not in secret_ids:
+                        secret_ids.append(secret_id)
         # no secrets
-        if not o:
+        if not secret_ids:
             return None
         # secrets exist
         result = SecretInfos()
-        client = boto3.client('secretsmanager', region_name=self.infos.region)
-        kmsKeyIds = []
-        for item in o:
-            for k, v in item.items():
-                secretId = v
-                try:
-                    response = client.describe_secret(SecretId=secretId)
-                    if response['ARN'] not in result.secrets_arn:
-                        a = {}
-                        a['id'] = v
-                        a['arn'] = response['ARN']
-                        result.secrets.append(a)
-                        result.secrets_arn.append(response['ARN'])
-                        if response['KmsKeyId'] not in kmsKeyIds:
-                            kmsKeyIds.append(response['KmsKeyId'])
-                except Exception as e:
-                    raise ValueError(f'Invalid secret: {secretId}, reason:{e}')
-
-        client = boto3.client('kms',  region_name=self.infos.region)
-        for k in kmsKeyIds:
-            response = client.describe_key(
-                KeyId=k, GrantTokens=['DescribeKey'])
-            result.kms_arn.append(response['KeyMetadata']['Arn'])
+        secrets = self._run_concurrently([lambda x=x: self._describe_secret(x) for x in secret_ids])
+        kms_key_ids = []
+        for secret_id, secret in zip(secret_ids, secrets):
+            result.secrets.append({'id': secret_id, 'arn': secret['arn']})
+            if secret['arn'] not in result.secrets_arn:
+                result.secrets_arn.append(secret['arn'])
+            # the secrets encrypted with the default key have no KmsKeyId
+            if secret['kms_key_id'] and secret['kms_key_id'] not in kms_key_ids:
+                kms_key_ids.append(secret['kms_key_id'])
+        for arn in self._run_concurrently([lambda x=x: self._describe_kms_key_arn(x) for x in kms_key_ids]):
+            if arn not in result.kms_arn:
+                result.kms_arn.append(arn)
         return result
+
+    def _describe_secret(self, secret_id):
+        """return the arn and the kms key id of the secret"""
+        def describe():
+            try:
+                response = self._client('secretsmanager').describe_secret(SecretId=secret_id)
+            except Exception as e:
+                raise ValueError(f'Invalid secret: {secret_id}, reason:{e}')
+            return {'arn': response['ARN'], 'kms_key_id': response.get('KmsKeyId')}
+        key = ('secret', self.infos.account_id, self.infos.region, secret_id)
+        return lookup_cache.get(key, describe)
+
+    def _describe_kms_key_arn(self, kms_key_id):
+        """return the arn of the kms key"""
+        def describe():
+            response = self._client('kms').describe_key(
+                KeyId=kms_key_id, GrantTokens=['DescribeKey'])
+            return response['KeyMetadata']['Arn']
+        key = ('kms_key', self.infos.account_id, self.infos.region, kms_key_id)
+        return lookup_cache.get(key, describe)
@@ -10,16 +10,20 @@ from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.prepareDeploymentLoadBalancerParametersStep import PrepareDeploymentLoadBalancerParametersStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 from ecs_crd.canaryReleaseInfos import FqdnInfos
+from ecs_crd.lookupCache import lookup_cache
+from ecs_crd.hostedZoneIndex import HostedZoneIndex
 
 class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( Global parameters )', logger)
 
-    def _process_account_id(self):
+    def _process_account_id(self, account_id):
         """update the AWS account ID informations for the service"""
-        self.infos.account_id = boto3.client('sts').get_caller_identity().get('Account')
+        self.infos.account_id = account_id
         self._log_information(key='Account ID', value=self.infos.account_id, ljust=18)
 
     def _process_env_data(self):
@@ -33,9 +37,9 @@ class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
         self.infos.canary_group = self.configuration['canary']['group']
         self._log_information(key='Canary group', value=self.infos.canary_group, ljust=18)
 
-    def _process_external_ip(self):
+    def _process_external_ip(self, external_ip):
         """update the external ip informations for the service"""
-        self.infos.external_ip = self._find_external_ip()
+        self.infos.external_ip = external_ip
         self._log_information(key='External IP', value=self.infos.external_ip, ljust=18)
 
     def _process_project(self):
@@ -61,40 +65,29 @@ class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
         self.infos.green_infos.stack['Parameters']['Version']['Default'] = self.infos.service_version
         self._log_information(key='Version', value=self.infos.service_version, ljust=18)
 
-    def _process_vpc_id(self):
+    def _process_vpc_id(self, vpc_id):
         """update the AWS vpc ID informations for the service"""
-        self.infos.vpc_id = self._find_vpc_Id()
+        self.infos.vpc_id = vpc_id
         self._log_information(key='Vpc ID', value=self.infos.vpc_id, ljust=18)
 
-    def _process_fqdn(self):
+    def _process_fqdn(self, fqdn):
         """update the fqdn"""
-
-        
-        source = self.configuration['service']['fqdn']
-        if isinstance(source, str):
-            self.infos.fqdn.append(self._to_fqdn_infos(source))
-        if isinstance(source, list):
-            for item in source:
-                self.infos.fqdn.append(self._to_fqdn_infos(item))
+        self.infos.fqdn.extend(fqdn)
         self._log_information(key='Fqdn', value=self.infos.fqdn[0].name, ljust=18)
 
         if len(self.infos.fqdn) > 1:
             for i in range(1, len(self.infos.fqdn)):
                 self.logger.info('                    '+self.infos.fqdn[i].name)
  
-    def _process_cluster(self):
+    def _process_cluster(self, clusterName, cluster):
         """update the AWS ECS cluster informations for the service"""
         # clusterName 
-        clusterName = self._bind_data('{{environment}}-ecs-cluster')
-        if 'cluster' in self.configuration['service']:
-            clusterName = self._bind_data(self.configuration['service']['cluster'])
         self.infos.cluster_name = clusterName
         self._log_information(key='Cluster', value=self.infos.cluster_name, ljust=18)
         self.infos.green_infos.stack['Parameters']['ClusterName']['Default'] = clusterName
         self.infos.init_infos.stack['Parameters']['ClusterName']['Default'] = clusterName
 
         # cluster
-        cluster = self._find_cluster(clusterName)
         self.infos.cluster = cluster
         self.infos.green_infos.stack['Parameters']['Cluster']['Default'] = cluster
         self._log_information(key='Cluster ID', value=self.infos.cluster, ljust=18)
@@ -103,16 +96,28 @@ class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
         """operation containing the processing performed by this step"""
         try:
             self._log_information(key=f'{self.infos.action} ID', value=self.infos.id, ljust=18)
-            self._process_account_id()
+            # independent AWS lookups are run concurrently, their results are applied in order
+            account_id, external_ip = self._run_concurrently([
+                self._find_account_id,
+                self._find_external_ip
+            ])
+            self._process_account_id(account_id)
             self._process_env_data()
             self._process_canary_group()
-            self._process_external_ip()
+            self._process_external_ip(external_ip)
             self._process_project()
             self._process_service_name()
             self._process_version()
-            self._process_vpc_id()
-            self._process_fqdn()
-            self._process_cluster()
+            # these lookups depend on the account and on the bound names
+            cluster_name = self._find_cluster_name()
+            vpc_id, fqdn, cluster = self._run_concurrently([
+                self._find_vpc_Id,
+                self._find_fqdn_infos,
+                lambda: self._find_cluster(cluster_name)
+            ])
+            self._process_vpc_id(vpc_id)
+            self._process_fqdn(fqdn)
+            self._process_cluster(cluster_name, cluster)
             self.infos.save()
             self._create_dynamodb_table()
             return PrepareDeploymentLoadBalancerParametersStep(self.infos, self.logger)
@@ -124,31 +129,87 @@ class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
         else:
             return None
 
+    def _find_account_id(self):
+        """find the AWS account ID"""
+        return self._client('sts').get_caller_identity().get('Account')
+
+    def _find_fqdn_infos(self):
+        """find the fqdn informations of the service"""
+        result = []
+        source = self.configuration['service']['fqdn']
+        if isinstance(source, str):
+            result.append(self._to_fqdn_infos(source))
+        if isinstance(source, list):
+            for item in source:
+                result.append(self._to_fqdn_infos(item))
+        return result
+
+    def _find_cluster_name(self):
+        """find the AWS ECS cluster name of the service"""
+        if 'cluster' in self.configuration['service']:
+            return self._bind_data(self.configuration['service']['cluster'])
+        return self._bind_data('{{environment}}-ecs-cluster')
+
     def _find_vpc_Id(self):
         """find the AWS VPC by environment"""
-        ec2 = boto3.resource('ec2', region_name=self.infos.region)
-        client = boto3.client('ec2', region_name=self.infos.region)
-        ids = map(lambda x: x.id, list(ec2.vpcs.filter(Filters=[])))
-        for id in ids:
-            response = client.describe_vpcs(VpcIds=[id])
-            if 'Tags' in response['Vpcs'][0]:
-                for tag in response['Vpcs'][0]['Tags']:
-                    if tag['Key'] == 'Environment' and tag['Value'] == self.infos.environment:
-                        return id
+        key = ('vpc', self.infos.account_id, self.infos.region, self.infos.environment)
+        return lookup_cache.get(key, self._describe_vpc_id)
+
+    def _describe_vpc_id(self):
+        """find the AWS VPC tagged with the environment"""
+        client = self._client('ec2')
+        filters = [{'Name': 'tag:Environment', 'Values': [self.infos.environment]}]
+        next_token = None
+        while True:
+            if next_token:
+                response = client.describe_vpcs(Filters=filters, NextToken=next_token)
+            else:
+                response = client.describe_vpcs(Filters=filters)
+            for vpc in response['Vpcs']:
+                return vpc['VpcId']
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
         raise ValueError('vpc id {} not found for environment'.format(self.infos.environment))
 
     def _find_cluster(self, clusterName):
         """find the AWS ECS cluster by name"""
-        client = boto3.client('ecs', region_name=self.infos.region)
-        response = client.list_clusters()
-        for arn in response['clusterArns']:
-            if arn.endswith(clusterName):
-                return arn
+        key = ('cluster', self.infos.account_id, self.infos.region, clusterName)
+        return lookup_cache.get(key, lambda: self._describe_cluster_arn(clusterName))
+
+    def _describe_cluster_arn(self, clusterName):
+        """find the AWS ECS cluster with a targeted call, the clusters listing is only used as fallback"""
+        response = self._client('ecs').describe_clusters(clusters=[clusterName])
+        for cluster in response['clusters']:
+            if cluster['status'] != 'INACTIVE':
+                return cluster['clusterArn']
+        key = ('clusters', self.infos.account_id, self.infos.region)
+        index = lookup_cache.get(key, self._list_cluster_arns)
+        arn = index.get(clusterName.split('/')[-1])
+        if arn:
+            return arn
         raise ValueError(f'Cluster "{clusterName}" not found.')
 
+    def _list_cluster_arns(self):
+        """return the index name => arn of all the AWS ECS clusters"""
+        client = self._client('ecs')
+        result = {}
+        next_token = None
+        while True:
+            if next_token:
+                response = client.list_clusters(nextToken=next_token)
+            else:
+                response = client.list_clusters()
+            for arn in response['clusterArns']:
+                result[arn.split('/')[-1]] = arn
+            next_token = response.get('nextToken')
+            if not next_token:
+                break
+        return result
+
     def _create_dynamodb_table(self):
         """create the AWS DynamoDB table if not exist"""
-        client = boto3.client('dynamodb', region_name=self.infos.region)
+        client = self._client('dynamodb')
         table_name = 'canary_release'
         existing_tables = client.list_tables()['TableNames']
         if table_name not in existing_tables:
@@ -186,21 +247,19 @@ class PrepareDeploymentGlobalParametersStep(CanaryReleaseDeployStep):
 
     def _to_fqdn_infos(self, source):
         name = self._bind_data(source)
-        data = name.strip('.').split('.')
-        hosted_zone_name = data[len(data)-2]+'.'+data[len(data)-1]
-        hosted_zone = self._find_hosted_zone(hosted_zone_name.strip('.')+'.')
-        hosted_zone_id = hosted_zone['Id']
+        hosted_zone = self._find_hosted_zone(name)
         result = FqdnInfos(
             name = name, 
-            hosted_zone_name = hosted_zone_name,
-            hosted_zone_id = hosted_zone_id
+            hosted_zone_name = hosted_zone['Name'].strip('.'),
+            hosted_zone_id = hosted_zone['Id']
         )
         return result
 
-    def _find_hosted_zone(self, hostZoneName):
-        """find the AWS Route53 dns zone by name"""
-        client = boto3.client('route53', region_name=self.infos.region)
-        response = client.list_hosted_zones()
-        for item in response['HostedZones']:
-            if item['Name'] == hostZoneName:
-                return item
+    def _find_hosted_zone(self, fqdn):
+        """find the AWS Route53 dns zone of the fqdn"""
+        key = ('hosted_zones', self.infos.account_id)
+        index = lookup_cache.get(key, lambda: HostedZoneIndex.load(self._client('route53')))
+        result = index.find(fqdn)
+        if not result:
+            raise ValueError(f'Hosted zone not found for fqdn "{fqdn}".')
+        return result
@@ -8,6 +8,8 @@ from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentIamPoliciesStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( IAM Role & Policies )', logger)
@@ -9,6 +9,8 @@ from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentInitStackStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( Init stack )', logger)
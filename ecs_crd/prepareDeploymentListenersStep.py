@@ -2,16 +2,24 @@
 # -*- coding: utf-8 -*-
 import boto3
 
+from ecs_crd.listenerRulePriorityAllocator import ListenerRulePriorityAllocator
+from ecs_crd.certificateIndex import CertificateIndex
+from ecs_crd.lookupCache import lookup_cache
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.prepareDeploymentIamPoliciesStep import PrepareDeploymentIamPoliciesStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos,  f'Prepare {infos.action}( Listeners )', logger)
-        self.current_priority = None
+        # priority allocator by listener arn
+        self._priority_allocators = {}
+        # priorities reserved for the service by listener arn
+        self._priorities = {}
 
     def _on_execute(self):
         """operation containing the processing performed by this step"""
@@ -54,12 +62,16 @@ class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
         self._log_information(key="Arn",value=listener_rule_infos.listener_arn, indent=1)
         self._log_information(key="Port", value=listener_rule_infos.configuration['port'], indent=1)
         self._log_information(key="Rules", value='', indent=1)
-        # rules
+        # rules, the priorities of the service are reserved in a contiguous range
+        rules = listener_rule_infos.configuration['rules']
+        allocator = self._find_priority_allocator(listener_rule_infos)
+        priorities = self._find_priorities(listener_rule_infos)
         count = 1
-        for rule in listener_rule_infos.configuration['rules']:
+        for rule in rules:
             resource_key = item['TargetGroupArn']['Ref'].replace('TargetGroup', f'ListenerRule{count}')
-            self.infos.green_infos.stack['Resources'][resource_key] = self._convert_2_listener_rule(listener_rule_infos, item, rule)
+            self.infos.green_infos.stack['Resources'][resource_key] = self._convert_2_listener_rule(listener_rule_infos, item, rule, priorities)
             count +=1
+        self._log_information(key="Fragmentation", value='{:.0%}'.format(allocator.fragmentation()), indent=1)
         # certificates
         certificates = self._find_certificates(listener_rule_infos.configuration)
         if certificates:
@@ -118,29 +130,22 @@ class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
 
     def _find_listener_rule_infos(self, listener_infos):
         """check if the AWS Application Load Balancer Listerner exist"""
-        listener = None
-        client = boto3.client('elbv2', region_name=self.infos.region)
-        response = client.describe_listeners(LoadBalancerArn=self.infos.green_infos.alb_arn)
-        for item in response['Listeners']:
-            if int(item['Port']) == int(listener_infos['port']):
-                listener = item
-                break
+        listener = self.infos.alb_topology(self.infos.green_infos.alb_arn).find_listener(listener_infos['port'])
         if listener:
             for item in self.infos.listener_rules_infos:
                 if item.configuration == listener_infos:
                     item.listener_arn = listener['ListenerArn']
-                    item.current_priority = self._find_last_listener_rule_priority(item)    
                     return item
 
     def _find_certificates(self, listener_infos):
         """find all cerficates used by listener"""
         result = []
         if 'certificates' in listener_infos:
-            client = boto3.client('acm', region_name=self.infos.region)
-            response = client.list_certificates()
-            for cert in response['CertificateSummaryList']:
-                for certificate in listener_infos['certificates']:
-                    if cert['DomainName'] == self._bind_data(certificate):
+            key = ('certificates', self.infos.account_id, self.infos.region)
+            index = lookup_cache.get(key, lambda: CertificateIndex.load(self._client('acm')))
+            for certificate in listener_infos['certificates']:
+                for cert in index.find(self._bind_data(certificate)):
+                    if cert not in result:
                         result.append(cert)
         return result
 
@@ -160,11 +165,11 @@ class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
                     return item
         return None
 
-    def _convert_2_listener_rule(self, listener_rule_infos, item, rule):
+    def _convert_2_listener_rule(self, listener_rule_infos, item, rule, priorities):
         listener_rule = {}
         listener_rule['Type'] = "AWS::ElasticLoadBalancingV2::ListenerRule"
         listener_rule['Properties'] = {}
-        listener_rule['Properties']['Priority'] = self._calculate_avalaible_priority_rule(listener_rule_infos, rule)
+        listener_rule['Properties']['Priority'] = self._calculate_avalaible_priority_rule(rule, priorities)
         listener_rule['Properties']['ListenerArn'] = listener_rule_infos.listener_arn
         self._log_information(key="- Priority",value=str(listener_rule['Properties']['Priority']), indent=2)
         # actions
@@ -192,15 +197,31 @@ class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
                 listener_rule['Properties']['Conditions'].append(self._convert_2_condition(condition))
         return listener_rule
     
-    def _find_last_listener_rule_priority(self, listener_rule_infos):
-        client = boto3.client('elbv2', region_name = self.infos.region)
-        response = client.describe_rules(ListenerArn = listener_rule_infos.listener_arn)
-        priorities = [2]
-        for item in response['Rules']:
-            priority = self._to_int(item['Priority'])
-            if priority:
-                priorities.append(priority)
-        return max(priorities, key=lambda x:x) + 1
+    def _find_priority_allocator(self, listener_rule_infos):
+        """return the priority allocator of the listener, the priorities set in the configuration are used first"""
+        listener_arn = listener_rule_infos.listener_arn
+        if listener_arn not in self._priority_allocators:
+            topology = self.infos.alb_topology(self.infos.green_infos.alb_arn)
+            allocator = ListenerRulePriorityAllocator(topology.priorities(listener_arn))
+            for item in self.infos.listener_rules_infos:
+                if item.listener_arn == listener_arn:
+                    for rule in item.configuration['rules']:
+                        if 'priority' in rule:
+                            allocator.use(rule['priority'])
+            self._priority_allocators[listener_arn] = allocator
+        return self._priority_allocators[listener_arn]
+
+    def _find_priorities(self, listener_rule_infos):
+        """return the priorities reserved for the rules without priority of all the target groups on the listener"""
+        listener_arn = listener_rule_infos.listener_arn
+        if listener_arn not in self._priorities:
+            count = 0
+            for item in self.infos.listener_rules_infos:
+                if item.listener_arn == listener_arn:
+                    count += sum(1 for x in item.configuration['rules'] if 'priority' not in x)
+            allocator = self._find_priority_allocator(listener_rule_infos)
+            self._priorities[listener_arn] = iter(allocator.reserve_range(count))
+        return self._priorities[listener_arn]
         
     def _find_host_port(self, container_name, container_port):
         """ find the host port for the tupe container name / container port"""
@@ -208,15 +229,11 @@ class PrepareDeploymentListenersStep(CanaryReleaseDeployStep):
         container_info = next((x for x in cfn_container_definitions if x['Name'] == container_name), None)
         return next((x for x in container_info['PortMappings'] if str(x['ContainerPort']) == str(container_port)), None)['HostPort']
 
-    def _calculate_avalaible_priority_rule(self, listener_rule_infos, rule):
+    def _calculate_avalaible_priority_rule(self, rule, priorities):
         """calculate avalaible priority rule"""
-        result = None
         if 'priority' in rule:
             return rule['priority']
-        else:
-            result = listener_rule_infos.current_priority
-            listener_rule_infos.current_priority += 1
-            return result
+        return next(priorities)
 
     def _convert_2_condition(self, item):
         condition = {}
@@ -12,6 +12,8 @@ from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentLoadBalancerParametersStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( Load Balancer parameters )', logger)
@@ -81,10 +83,7 @@ class PrepareDeploymentLoadBalancerParametersStep(CanaryReleaseDeployStep):
             self.infos.blue_infos.canary_release = blue.canary_release
             self.infos.blue_infos.alb_hosted_zone_id = green.hosted_zone_id
             if dynamodb_item:
-                exist_blue_deployment = self._find_cloud_formation_stack(dynamodb_item['stack_name'])
-                if exist_blue_deployment:
-                    self.infos.blue_infos.stack_id = exist_blue_deployment['StackId']
-                    self.infos.blue_infos.stack_name = f'{self.infos.environment}-{self.infos.service_name}-{blue.canary_release}'
+                self._process_blue_stack(dynamodb_item)
             
             self._log_sub_title('Load balancer "blue" {}'.format('(elected)' if self.infos.elected_release == 'blue' and self.infos.action=='deploy' else ''))
             self._log_information(key='Fqdn', value=blue.dns_name, ljust=4)
@@ -103,56 +102,20 @@ class PrepareDeploymentLoadBalancerParametersStep(CanaryReleaseDeployStep):
             self.logger.error(self.title, exc_info=True)
             return SendNotificationBySnsStep(self.infos, self.logger)
          
-    def _find_cloud_formation_stack(self, stack_name, next_token=None):
-        client = boto3.client('cloudformation', region_name=self.infos.region)
-        response = None
-        if next_token:
-            response = client.list_stacks(StackStatusFilter=['CREATE_COMPLETE'], NextToken=next_token )
-        else:
-            response = client.list_stacks(StackStatusFilter=['CREATE_COMPLETE'])
-        count = sum(1 for e in response['StackSummaries'] if e['StackName'] == stack_name)
-        if count == 0:
-            if 'NextToken' in response:
-                return self._find_cloud_formation_stack(stack_name, response['NextToken'])
-            else:
-                return None
-        response = client.describe_stacks(StackName=stack_name)
-        if len(response['Stacks']) == 1:
-            return response['Stacks'][0]
-        else:
-            return None
+    def _process_blue_stack(self, dynamodb_item):
+        """update the stack informations of the blue release deployed previously"""
+        exist_blue_deployment = self._find_cloud_formation_stack(dynamodb_item['stack_name'])
+        if exist_blue_deployment:
+            self.infos.blue_infos.stack_id = exist_blue_deployment['StackId']
+            # the name of the existing stack (see _generate_name, the environment and the service name are shortened)
+            self.infos.blue_infos.stack_name = exist_blue_deployment['StackName']
+
+    def _find_cloud_formation_stack(self, stack_name):
+        return self.infos.stack_inventory.find(stack_name)
 
     def _find_load_balancers(self, dynamodb_item):
-        client = boto3.client('elbv2', region_name=self.infos.region)
-        response = client.describe_load_balancers()
-        albs = []
-        for item in response['LoadBalancers']:
-            if item['VpcId'] != self.infos.vpc_id or item['Type'] != 'application':
-                continue
-            arn = item['LoadBalancerArn']
-            dnsName = item['DNSName']
-            canonicalHostedZoneId = item['CanonicalHostedZoneId']
-            canaryRelease = None
-            canaryGroup = None
-            # find tag informations
-            response = client.describe_tags(ResourceArns=[arn])
-            for tagDescriptions in response['TagDescriptions']:
-                for tag in tagDescriptions['Tags']:
-                    if tag['Key'] == 'CanaryRelease':
-                        canaryRelease = tag['Value']
-                    if tag['Key'] == 'CanaryGroup' and tag['Value'] == self.infos.canary_group:
-                        canaryGroup = self.infos.canary_group
-
-            # aln is ready 
-            if canaryRelease and canaryGroup:
-                albs.append(
-                    LoadBalancerInfos(
-                        arn=arn, 
-                        dns_name= dnsName , 
-                        canary_release = canaryRelease, 
-                        hosted_zone_id=canonicalHostedZoneId
-                    )
-                )
+        index = self._index_load_balancers_by_canary_group(self._list_load_balancers())
+        albs = index.get(self.infos.canary_group, [])
 
         # no alb found to deploy
         if not albs:
@@ -169,13 +132,12 @@ class PrepareDeploymentLoadBalancerParametersStep(CanaryReleaseDeployStep):
             if alb.arn != blue_alb_arn:
                 alb.is_elected = True
                 elected_alb = alb
-                response = client.describe_listeners(LoadBalancerArn=alb.arn)
+                topology = self.infos.alb_topology(alb.arn)
                 for item in self.configuration['listeners']:
                     # rechercher de l'écouteur associé au port 
-                    listeners = list(filter(lambda x: x['Port'] == int(item['port']),response['Listeners']))
+                    listener = topology.find_listener(item['port'])
                     # le port est déjà écouté sur le 'load balancer' , on doit créer un 'listener rule'
-                    if len(listeners) == 1:
-                        listener = listeners[0]
+                    if listener:
                         # on vérifie qu'il y a une règle pour le
                         if 'rules' not in item:
                             container_name = 'default'
@@ -191,13 +153,59 @@ class PrepareDeploymentLoadBalancerParametersStep(CanaryReleaseDeployStep):
         self.infos.elected_release = 'blue' if str(elected_alb.canary_release) == str(self.configuration['canary']['releases']['blue']) else 'green'
         return albs
 
+    def _list_load_balancers(self):
+        """return all the application load balancers of the vpc"""
+        client = self._client('elbv2')
+        result = []
+        marker = None
+        while True:
+            if marker:
+                response = client.describe_load_balancers(Marker=marker)
+            else:
+                response = client.describe_load_balancers()
+            for item in response['LoadBalancers']:
+                if item['VpcId'] == self.infos.vpc_id and item['Type'] == 'application':
+                    result.append(item)
+            marker = response.get('NextMarker')
+            if not marker:
+                break
+        return result
+
+    def _find_load_balancer_tags(self, arns, batch_size=20):
+        """return the tags by arn of the load balancers (describe_tags accepts 20 arns by call)"""
+        client = self._client('elbv2')
+        batches = [arns[i:i+batch_size] for i in range(0, len(arns), batch_size)]
+        result = {}
+        for response in self._run_concurrently([lambda x=x: client.describe_tags(ResourceArns=x) for x in batches]):
+            for tagDescriptions in response['TagDescriptions']:
+                result[tagDescriptions['ResourceArn']] = {tag['Key']: tag['Value'] for tag in tagDescriptions['Tags']}
+        return result
+
+    def _index_load_balancers_by_canary_group(self, load_balancers):
+        """return the index canary group => load balancers, only the load balancers with a canary release are indexed"""
+        tags = self._find_load_balancer_tags([x['LoadBalancerArn'] for x in load_balancers])
+        result = {}
+        for item in load_balancers:
+            alb_tags = tags.get(item['LoadBalancerArn'], {})
+            if 'CanaryGroup' not in alb_tags or not alb_tags.get('CanaryRelease'):
+                continue
+            result.setdefault(alb_tags['CanaryGroup'], []).append(
+                LoadBalancerInfos(
+                    arn=item['LoadBalancerArn'],
+                    dns_name=item['DNSName'],
+                    canary_release=alb_tags['CanaryRelease'],
+                    hosted_zone_id=item['CanonicalHostedZoneId']
+                )
+            )
+        return result
+
     def _delete_obsolete_item(self):
-        client = boto3.resource('dynamodb', region_name=self.infos.region)
+        client = self._resource('dynamodb')
         table = client.Table('canary_release')
         table.delete_item(Key={'id': self.infos.get_hash()})
 
     def _find_blue_dynamodb_item(self):
-        client = boto3.resource('dynamodb', region_name = self.infos.region)
+        client = self._resource('dynamodb')
         table = client.Table('canary_release')
         response = table.get_item(Key={'id': self.infos.get_hash()})
 
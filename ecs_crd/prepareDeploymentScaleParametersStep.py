@@ -3,11 +3,15 @@
 
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.canaryReleaseInfos import ScaleInfos
+from ecs_crd.canaryReleaseInfos import PollingInfos
+from ecs_crd.canaryReleaseInfos import HealthInfos
 from ecs_crd.prepareDeploymentContainerDefinitionsStep import PrepareDeploymentContainerDefinitionsStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentScaleParametersStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( Scale parameters )', logger)
@@ -27,6 +31,8 @@ class PrepareDeploymentScaleParametersStep(CanaryReleaseDeployStep):
                     self.infos.scale_infos.wait = int(scale['wait'])
             self._log_information(key='Desired  Instances', value=self.infos.scale_infos.desired,indent=1, ljust=18)
             self._log_information(key='Wait', value=f'{self.infos.scale_infos.wait}s', indent=1, ljust=18)
+            self._process_polling()
+            self._process_health()
             self.infos.save()
             return PrepareDeploymentContainerDefinitionsStep(self.infos, self.logger)
 
@@ -34,4 +40,58 @@ class PrepareDeploymentScaleParametersStep(CanaryReleaseDeployStep):
             self.infos.exit_code = 3
             self.infos.exit_exception = e
             self.logger.error(self.title, exc_info=True)
-            return SendNotificationBySnsStep(self.infos, self.logger)
\ No newline at end of file
+            return SendNotificationBySnsStep(self.infos, self.logger)
+
+    def _process_polling(self):
+        """update the polling informations used by all the wait loops"""
+        self.infos.polling_infos = PollingInfos()
+        if 'polling' in self.configuration['canary']:
+            polling = self.configuration['canary']['polling'] or {}
+            self._update_polling_curve(
+                polling, self.infos.polling_infos, ['interval', 'backoff', 'max_interval', 'jitter', 'timeout'], 'canary.polling')
+            if self.infos.polling_infos.jitter > 1:
+                raise ValueError(f'jitter: {self.infos.polling_infos.jitter} is not valid for canary.polling.')
+        self._log_information(key='Polling', value='', indent=1)
+        self._log_information(key='Interval', value=f'{self.infos.polling_infos.interval}s', indent=2, ljust=12)
+        self._log_information(key='Backoff', value=f'x{self.infos.polling_infos.backoff}', indent=2, ljust=12)
+        self._log_information(key='Max interval', value=f'{self.infos.polling_infos.max_interval}s', indent=2, ljust=12)
+        self._log_information(key='Jitter', value=f'{self.infos.polling_infos.jitter}', indent=2, ljust=12)
+        self._log_information(key='Timeout', value=f'{self.infos.polling_infos.timeout}s', indent=2, ljust=12)
+
+    def _process_health(self):
+        """update the health convergence policy of the green release"""
+        self.infos.health_infos = HealthInfos()
+        if 'health' in self.configuration['canary']:
+            health = self.configuration['canary']['health'] or {}
+            self._update_polling_curve(
+                health, self.infos.health_infos, ['min_healthy_ratio', 'consecutive_healthy', 'interval', 'backoff', 'max_interval', 'timeout'], 'canary.health')
+            if not 0 < self.infos.health_infos.min_healthy_ratio <= 1:
+                raise ValueError(f'min_healthy_ratio: {self.infos.health_infos.min_healthy_ratio} is not valid for canary.health.')
+            if not isinstance(self.infos.health_infos.consecutive_healthy, int) or self.infos.health_infos.consecutive_healthy < 1:
+                raise ValueError(f'consecutive_healthy: {self.infos.health_infos.consecutive_healthy} is not valid for canary.health.')
+        self._log_information(key='Health', value='', indent=1)
+        self._log_information(key='Min healthy', value=f'{self.infos.health_infos.min_healthy_ratio:.0%}', indent=2, ljust=12)
+        self._log_information(key='Consecutive', value=self.infos.health_infos.consecutive_healthy, indent=2, ljust=12)
+        self._log_information(key='Interval', value=f'{self.infos.health_infos.interval}s', indent=2, ljust=12)
+        self._log_information(key='Backoff', value=f'x{self.infos.health_infos.backoff}', indent=2, ljust=12)
+        self._log_information(key='Max interval', value=f'{self.infos.health_infos.max_interval}s', indent=2, ljust=12)
+        self._log_information(key='Timeout', value=f'{self.infos.health_infos.timeout}s', indent=2, ljust=12)
+
+    def _update_polling_curve(self, source, target, keys, section):
+        """update the numeric values of the target from the source and check its polling curve (interval, backoff, max_interval, timeout)"""
+        for k in keys:
+            if k in source:
+                # bool is a subclass of int (true would be 1)
+                if isinstance(source[k], bool) or not isinstance(source[k], (int, float)) or source[k] < 0:
+                    raise ValueError(f'{k}: {source[k]} is not valid for {section}.')
+                target.__dict__[k] = source[k]
+        # an interval of 0 would call the AWS apis in a tight loop until the timeout
+        if target.interval <= 0:
+            raise ValueError(f'interval: {target.interval} is not valid for {section}.')
+        if target.max_interval < target.interval:
+            raise ValueError(f'max_interval: {target.max_interval} is not valid for {section}.')
+        if target.backoff < 1:
+            raise ValueError(f'backoff: {target.backoff} is not valid for {section}.')
+        # a timeout of 0 would fail the wait loops at the first check
+        if target.timeout <= 0:
+            raise ValueError(f'timeout: {target.timeout} is not valid for {section}.')
@@ -3,17 +3,21 @@
 
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.canaryReleaseInfos import StrategyInfos
+from ecs_crd.canaryReleaseInfos import AnalysisInfos
 from ecs_crd.prepareDeploymentInitStackStep import PrepareDeploymentInitStackStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentStrategyStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
         super().__init__(infos, f'Prepare {infos.action} ( Canary Strategy )', logger)
         self.min_wait = 40
         self.default_weight = 50
         self.default_wait = 60
+        self.no_decision_actions = ['rollback', 'promote']
 
     def _process_strategy(self):
         """update strategies informations for the service"""
@@ -41,10 +45,40 @@ class PrepareDeploymentStrategyStep(CanaryReleaseDeployStep):
             self._log_information(key='- Weight', value=a.weight, indent=1)
             self._log_information(key='  Wait', value=f'{a.wait}s', indent=1)
 
+    def _process_analysis(self):
+        """update the canary analysis informations for the service"""
+        self.infos.analysis_infos = None
+        source = self.configuration['canary']
+        if 'analysis' not in source:
+            return
+        analysis = source['analysis'] or {}
+        self.infos.analysis_infos = AnalysisInfos()
+        for k in ['window', 'period', 'interval', 'min_requests', 'max_error_rate_increase', 'max_latency_ratio']:
+            if k in analysis:
+                if isinstance(analysis[k], bool) or not isinstance(analysis[k], (int, float)) or analysis[k] < 0:
+                    raise ValueError(f'{k}: {analysis[k]} is not valid for canary.analysis.')
+                self.infos.analysis_infos.__dict__[k] = analysis[k]
+        if 'on_no_decision' in analysis:
+            if analysis['on_no_decision'] not in self.no_decision_actions:
+                raise ValueError(f"on_no_decision: {analysis['on_no_decision']} is not valid for canary.analysis.")
+            self.infos.analysis_infos.on_no_decision = analysis['on_no_decision']
+        if self.infos.analysis_infos.period < 60 or self.infos.analysis_infos.period % 60 != 0:
+            raise ValueError(f'period: {self.infos.analysis_infos.period} is not valid for canary.analysis.')
+        if self.infos.analysis_infos.interval <= 0:
+            raise ValueError(f'interval: {self.infos.analysis_infos.interval} is not valid for canary.analysis.')
+        self._log_information(key='Analysis', value='', indent=1)
+        self._log_information(key='Window', value=f'{self.infos.analysis_infos.window}s', indent=2, ljust=22)
+        self._log_information(key='Interval', value=f'{self.infos.analysis_infos.interval}s', indent=2, ljust=22)
+        self._log_information(key='Min requests', value=self.infos.analysis_infos.min_requests, indent=2, ljust=22)
+        self._log_information(key='Max 5xx rate increase', value=f'{self.infos.analysis_infos.max_error_rate_increase:.2%}', indent=2, ljust=22)
+        self._log_information(key='Max p99 latency ratio', value=f'x{self.infos.analysis_infos.max_latency_ratio}', indent=2, ljust=22)
+        self._log_information(key='On no decision', value=self.infos.analysis_infos.on_no_decision, indent=2, ljust=22)
+
     def _on_execute(self):
         """operation containing the processing performed by this step"""
         try:
             self._process_strategy()
+            self._process_analysis()
             return PrepareDeploymentInitStackStep(self.infos,self.logger)
         except Exception as e:
             self.infos.exit_code = 10
@@ -7,6 +7,8 @@ from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
 class PrepareDeploymentTargetGroupsStep(CanaryReleaseDeployStep):
 
+    resumable = False
+
     def __init__(self, infos, logger):
         """initialize a new instance of class"""
         super().__init__(infos, f'Prepare {infos.action} ( Target groups )', logger)
@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import boto3
-import json
-import time
 import traceback
 
-from ecs_crd.defaultJSONEncoder import DefaultJSONEncoder
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
+from ecs_crd.route53WeightChanges import Route53WeightChanges
 from ecs_crd.destroyGreenStackStep import DestroyGreenStackStep
 from ecs_crd.sendNotificationBySnsStep import SendNotificationBySnsStep
 
-class RollbackChangeRoute53WeightsStep(CanaryReleaseDeployStep):
+class RollbackChangeRoute53WeightsStep(Route53WeightChanges, CanaryReleaseDeployStep):
 
     def __init__(self, infos, logger):
         """initializes a new instance of the class"""
@@ -19,7 +17,7 @@ class RollbackChangeRoute53WeightsStep(CanaryReleaseDeployStep):
     def _on_execute(self):
         """operation containing the processing performed by this step"""
         try:
-            client = boto3.client('route53')
+            client = self._client('route53')
             if self.infos.blue_infos.stack_id !=None:
                 self._rollback_weights(client)
             return DestroyGreenStackStep(self.infos, self.logger)
@@ -34,48 +32,6 @@ class RollbackChangeRoute53WeightsStep(CanaryReleaseDeployStep):
         blue = list(filter(lambda x: x['Name'] == f"{fqdn_infos.name}." and x['SetIdentifier'] == self.infos.blue_infos.canary_release, response['ResourceRecordSets']))
         return int(blue[0]['Weight']) < 100
 
-    def _rollback_weights_by_fqdn(self, fqdn_infos, client):
-        self._log_information(key='Fqdn', value= fqdn_infos.name)
-        response = client.change_resource_record_sets(
-            HostedZoneId=self.infos.hosted_zone_id,
-            ChangeBatch={
-                'Comment': 'Rollback Route53 records sets for canary blue-green deployment',
-                'Changes': [
-                    {
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': fqdn_infos.name + '.',
-                            'Type': 'CNAME',
-                            'SetIdentifier': self.infos.blue_infos.canary_release,
-                            'Weight': 100,
-                            'TTL': 60,
-                            'ResourceRecords': [
-                                {
-                                    'Value': self.infos.blue_infos.alb_dns
-                                },
-                            ]
-                        }
-                    },
-                    {
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': fqdn_infos.name + '.',
-                            'Type': 'CNAME',
-                            'SetIdentifier': self.infos.green_infos.canary_release,
-                            'Weight': 0,
-                            'TTL': 60,
-                            'ResourceRecords': [
-                                {
-                                    'Value': self.infos.green_infos.alb_dns
-                                },
-                            ]
-                        }
-                    }
-                ]
-            }
-        )
-        self._wait(60, 'Change DNS Weights in progress')
-
     def _rollback_weights(self, client):
         self.logger.info('Blue')
         self.logger.info(f' DNS     :{self.infos.blue_infos.alb_dns}')
@@ -87,11 +43,14 @@ class RollbackChangeRoute53WeightsStep(CanaryReleaseDeployStep):
         self.logger.info(f' Release :{self.infos.green_infos.canary_release}')     
         self.logger.info('')
 
-        for fqdn_infos in self.infos.fqdn:
-            self._log_information(key='Fqdn', value=fqdn_infos.name)
-            if self._is_ready_to_rollback_weights(fqdn_infos, client):
-                self._rollback_weights_by_fqdn(fqdn_infos, client)
-            else:
-                self.logger.info(f" No change in weight of DNS")
+        readies = self._run_concurrently([lambda x=x: self._is_ready_to_rollback_weights(x, client) for x in self.infos.fqdn])
+        fqdns = [x for x, ready in zip(self.infos.fqdn, readies) if ready]
+        if not fqdns:
+            self.logger.info(f" No change in weight of DNS")
+            return
+        change_ids = self._change_weights_by_hosted_zone(
+            client, fqdns, 100, 0,
+            'Rollback Route53 records sets for canary blue-green deployment')
+        self._wait_changes_insync(client, change_ids)
 
  
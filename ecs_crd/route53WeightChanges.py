@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class Route53WeightChanges:
+    """change the Route 53 weights of the blue and green records, mixed in the steps of the deployment that shift the traffic"""
+
+    def _change_weights_by_hosted_zone(self, client, fqdns, blue_weight, green_weight, comment):
+        """send one atomic change batch by hosted zone (the hosted zones are sent concurrently) and return the change ids"""
+        changes = {}
+        for fqdn in fqdns:
+            self._log_information(key='Fqdn', value=fqdn.name)
+            changes.setdefault(fqdn.hosted_zone_id, []).extend(self._to_weight_changes(fqdn, blue_weight, green_weight))
+        responses = self._run_concurrently([
+            lambda x=x: client.change_resource_record_sets(
+                HostedZoneId=x,
+                ChangeBatch={
+                    'Comment': comment,
+                    'Changes': changes[x]
+                }
+            ) for x in changes])
+        return [x['ChangeInfo']['Id'] for x in responses]
+
+    def _wait_changes_insync(self, client, change_ids):
+        """pause the process until the route 53 changes are propagated"""
+        pending = list(change_ids)
+        def is_insync():
+            pending[:] = [x for x in pending if client.get_change(Id=x)['ChangeInfo']['Status'] != 'INSYNC']
+            return not pending
+        self._poll(is_insync, 'Route 53 changes propagation in progress')
+
+    def _to_weight_changes(self, fqdn, blue_weight, green_weight):
+        """return the changes of the weighted records of the fqdn"""
+        return [
+            {
+                'Action': 'UPSERT',
+                'ResourceRecordSet': {
+                    'Name': f"{fqdn.name}.",
+                    'Type': 'CNAME',
+                    'SetIdentifier': self.infos.blue_infos.canary_release,
+                    'Weight': blue_weight,
+                    'TTL': 60,
+                    'ResourceRecords': [
+                        {
+                            'Value': self.infos.blue_infos.alb_dns
+                        },
+                    ]
+                },
+            },
+            {
+                'Action': 'UPSERT',
+                'ResourceRecordSet': {
+                    'Name': f"{fqdn.name}.",
+                    'Type': 'CNAME',
+                    'SetIdentifier': self.infos.green_infos.canary_release,
+                    'Weight': green_weight,
+                    'TTL': 60,
+                    'ResourceRecords': [
+                        {
+                            'Value': self.infos.green_infos.alb_dns
+                        },
+                    ]
+                },
+            }
+        ]
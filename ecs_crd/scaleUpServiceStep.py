@@ -6,6 +6,7 @@ import json
 import time
 import traceback
 
+from ecs_crd.canaryReleaseInfos import PollingInfos
 from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
 from ecs_crd.destroyGreenStackStep import DestroyGreenStackStep
 from ecs_crd.applyStrategyStep import CheckGreenHealthStep
@@ -28,7 +29,7 @@ class ScaleUpServiceStep(CanaryReleaseDeployStep):
             self.logger.info('')
             self.logger.info('Scaling up in progress ...')
             self.logger.info('')
-            client = boto3.client('ecs', region_name=self.infos.region)
+            client = self._client('ecs')
             if self.infos.scale_infos.desired > 1:
                 client.update_service(
                     cluster=self.infos.cluster,
@@ -47,7 +48,7 @@ class ScaleUpServiceStep(CanaryReleaseDeployStep):
                     service=service_arn,
                     desiredCount=self.infos.scale_infos.desired,
                     forceNewDeployment= True)
-            self._wait(self.infos.scale_infos.wait, 'Scaling up in progress')
+            self._wait_service_steady(client, service_arn)
             self.logger.info('')
             self.logger.info(f'Desired instances : {self.infos.scale_infos.desired}')
             return CheckGreenHealthStep(self.infos, self.logger)
@@ -60,7 +61,28 @@ class ScaleUpServiceStep(CanaryReleaseDeployStep):
 
     def _find_service_arn(self):
         """find AWS ARN of service"""
-        client = boto3.client('cloudformation', region_name=self.infos.region)
+        client = self._client('cloudformation')
         response = client.describe_stacks(StackName= self.infos.green_infos.stack_name)
         output = next(x for x in response['Stacks'][0]['Outputs'] if x['OutputKey']=='ServiceArn')
-        return output['OutputValue']
\ No newline at end of file
+        return output['OutputValue']
+
+    def _wait_service_steady(self, client, service_arn):
+        """wait until the service is steady, the scale wait time is only an upper bound"""
+        polling_infos = PollingInfos(**self.infos.polling_infos.__dict__)
+        polling_infos.timeout = self.infos.scale_infos.wait
+        steady = self._poll(lambda: self._is_service_steady(client, service_arn), 'Scaling up in progress', polling_infos, raise_on_timeout=False)
+        if not steady:
+            self.logger.info(f'The service is not steady after {self.infos.scale_infos.wait}s.')
+
+    def _is_service_steady(self, client, service_arn):
+        """the service is steady when its only deployment runs all the desired tasks"""
+        response = client.describe_services(cluster=self.infos.cluster, services=[service_arn])
+        service = response['services'][0]
+        deployments = service['deployments']
+        self._log_information(key='Running', value=f"{service['runningCount']}/{service['desiredCount']}", indent=1)
+        if len(deployments) != 1:
+            return False
+        deployment = deployments[0]
+        if deployment.get('rolloutState', 'COMPLETED') != 'COMPLETED':
+            return False
+        return deployment['runningCount'] == deployment['desiredCount'] == self.infos.scale_infos.desired
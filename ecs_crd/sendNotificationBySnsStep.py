@@ -43,7 +43,7 @@ class SendNotificationBySnsStep(CanaryReleaseDeployStep):
                 message +=f'\nMessage        : {self.infos.exit_exception}'
                 subject = '[SUCCESS]' if self.infos.exit_code == 0 else '[FAIL]'
                 subject += f' {self.infos.action} - {self.infos.service_name}' 
-                client = boto3.client('sns', region_name=self.infos.region)
+                client = self._client('sns')
                 self._log_information(key='Sending Notification ... ', value=None)
                 try:
                     client.publish(
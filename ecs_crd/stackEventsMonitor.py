@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class StackEventsMonitor:
+    """tail the events of a cloud formation stack (describe_stack_events)
+
+    Only the events emitted since the last call (high-water mark) are
+    logged, the stack status is read from the events of the stack itself.
+    """
+
+    def __init__(self, client, stack_id, logger):
+        """initializes a new instance of the class"""
+        self.client = client
+        self.stack_id = stack_id
+        self.logger = logger
+        self.stack_status = None
+        self._last_event_id = None
+
+    def mark(self):
+        """ignore the events already emitted by the stack"""
+        response = self.client.describe_stack_events(StackName=self.stack_id)
+        events = response['StackEvents']
+        if events:
+            self._last_event_id = events[0]['EventId']
+            self._update_stack_status(reversed(events))
+        return self.stack_status
+
+    def poll(self):
+        """log the new events of the stack and return the stack status"""
+        events = self._find_new_events()
+        for event in events:
+            message = event['LogicalResourceId'].ljust(40, '.') + event['ResourceStatus']
+            if 'ResourceStatusReason' in event:
+                message += f' ( {event["ResourceStatusReason"]} )'
+            self.logger.info(message)
+        self._update_stack_status(events)
+        return self.stack_status
+
+    def _find_new_events(self):
+        """return the events emitted after the high-water mark, oldest first"""
+        result = []
+        next_token = None
+        while True:
+            if next_token:
+                response = self.client.describe_stack_events(StackName=self.stack_id, NextToken=next_token)
+            else:
+                response = self.client.describe_stack_events(StackName=self.stack_id)
+            # events are sorted by the most recent first
+            for event in response['StackEvents']:
+                if event['EventId'] == self._last_event_id:
+                    next_token = None
+                    break
+                result.append(event)
+            else:
+                next_token = response.get('NextToken')
+            if not next_token:
+                break
+        if result:
+            self._last_event_id = result[0]['EventId']
+        result.reverse()
+        return result
+
+    def _update_stack_status(self, events):
+        for event in events:
+            if event['ResourceType'] == 'AWS::CloudFormation::Stack' and event['PhysicalResourceId'] == event['StackId']:
+                self.stack_status = event['ResourceStatus']
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from botocore.exceptions import ClientError
+
+
+class StackInventory:
+    """cloud formation stacks of the deployment indexed by name, each stack is described once by run"""
+
+    def __init__(self, client, stack_status='CREATE_COMPLETE'):
+        """initializes a new instance of the class"""
+        self.client = client
+        self.stack_status = stack_status
+        self._lock = threading.Lock()
+        self._stacks = {}
+
+    def find(self, stack_name):
+        """return the stack (describe_stacks) if it exists with the expected status, otherwise None"""
+        with self._lock:
+            if stack_name in self._stacks:
+                return self._stacks[stack_name]
+        result = self._describe_stack(stack_name)
+        with self._lock:
+            self._stacks[stack_name] = result
+        return result
+
+    def forget(self, stack_name):
+        """forget the stack, it is described again on the next call (the stack is created or deleted)"""
+        with self._lock:
+            self._stacks.pop(stack_name, None)
+
+    def _describe_stack(self, stack_name):
+        try:
+            response = self.client.describe_stacks(StackName=stack_name)
+        except ClientError as e:
+            if 'does not exist' in str(e):
+                return None
+            raise
+        for stack in response['Stacks']:
+            if stack['StackStatus'] == self.stack_status:
+                return stack
+        return None
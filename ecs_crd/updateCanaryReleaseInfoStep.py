@@ -18,7 +18,7 @@ class UpdateCanaryReleaseInfoStep(CanaryReleaseDeployStep):
     def _on_execute(self):
         """operation containing the processing performed by this step"""
         try:
-            client = boto3.resource('dynamodb', region_name=self.infos.region)
+            client = self._resource('dynamodb')
             table = client.Table('canary_release')
             if self.infos.action == 'deploy':
                 if self._exist_item(client, table):
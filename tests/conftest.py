@@ -0,0 +1,47 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import FqdnInfos
+from ecs_crd.canaryReleaseInfos import ReleaseInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+import ecs_crd.canaryReleaseDeployStep
+
+logger = logging.Logger('mock')
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    result = FakeClock()
+    monkeypatch.setattr(ecs_crd.canaryReleaseDeployStep.time, 'monotonic', result.monotonic)
+    monkeypatch.setattr(ecs_crd.canaryReleaseDeployStep.time, 'sleep', result.sleep)
+    return result
+
+@pytest.fixture
+def sleeps(clock):
+    return clock.sleeps
+
+@pytest.fixture
+def create_step():
+    """factory of a step with the canary configuration, the fqdn (name: hosted zone id) and the blue / green releases"""
+    def factory(step_class, canary=None, fqdn=None, **kwargs):
+        infos = CanaryReleaseInfos(action='test', **kwargs)
+        if canary is not None:
+            infos.configuration = DeploymentConfiguration({'canary': canary})
+        infos.fqdn = [FqdnInfos(name=k, hosted_zone_id=v) for k, v in (fqdn or {}).items()]
+        infos.blue_infos = ReleaseInfos(canary_release='1', alb_dns='blue.elb.amazonaws.com')
+        infos.green_infos.canary_release = '2'
+        infos.green_infos.alb_dns = 'green.elb.amazonaws.com'
+        return step_class(infos, logger)
+    return factory
@@ -0,0 +1,45 @@
+import pytest
+
+from ecs_crd.albTopology import AlbTopology
+
+class FakeElbv2Client:
+    def __init__(self, listeners, rules, page_size=2):
+        self.data = {'Listeners': listeners, 'Rules': rules}
+        self.page_size = page_size
+        self.calls = []
+
+    def _page(self, key, Marker):
+        start = int(Marker) if Marker else 0
+        end = start + self.page_size
+        response = {key: self.data[key][start:end]}
+        if end < len(self.data[key]):
+            response['NextMarker'] = str(end)
+        return response
+
+    def describe_listeners(self, LoadBalancerArn, Marker=None):
+        self.calls.append('describe_listeners')
+        return self._page('Listeners', Marker)
+
+    def describe_rules(self, ListenerArn, Marker=None):
+        self.calls.append('describe_rules')
+        return self._page('Rules', Marker)
+
+def _create_client():
+    listeners = [{'ListenerArn': f'arn:listener/{x}', 'Port': x} for x in [80, 443, 8080]]
+    rules = [{'Priority': x} for x in ['12', '3', '7', 'default', '40']]
+    return FakeElbv2Client(listeners, rules)
+
+def test_find_listener():
+    client = _create_client()
+    topology = AlbTopology(client, 'arn:alb/1')
+    assert topology.find_listener('8080')['ListenerArn'] == 'arn:listener/8080'
+    assert topology.find_listener(443)['ListenerArn'] == 'arn:listener/443'
+    assert topology.find_listener(81) is None
+    assert client.calls == ['describe_listeners', 'describe_listeners']
+
+def test_priorities():
+    client = _create_client()
+    topology = AlbTopology(client, 'arn:alb/1')
+    assert topology.priorities('arn:listener/443') == [3, 7, 12, 40]
+    assert topology.priorities('arn:listener/443') == [3, 7, 12, 40]
+    assert client.calls.count('describe_rules') == 3
@@ -0,0 +1,192 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import AnalysisInfos
+from ecs_crd.applyStrategyStep import ChangeRoute53WeightsStep
+from ecs_crd.applyStrategyStep import CheckGreenHealthStep
+from ecs_crd.canaryReleaseInfos import ScaleInfos
+from ecs_crd.canaryReleaseInfos import HealthInfos
+
+logger = logging.Logger('mock')
+
+class FakeRoute53Client:
+    def __init__(self, pending_polls=1):
+        self.batches = []
+        self.pending_polls = pending_polls
+        self.get_change_calls = []
+
+    def change_resource_record_sets(self, HostedZoneId, ChangeBatch):
+        self.batches.append((HostedZoneId, ChangeBatch['Changes']))
+        return {'ChangeInfo': {'Id': f'/change/{HostedZoneId}', 'Status': 'PENDING'}}
+
+    def get_change(self, Id):
+        self.get_change_calls.append(Id)
+        polls = self.get_change_calls.count(Id)
+        return {'ChangeInfo': {'Id': Id, 'Status': 'INSYNC' if polls > self.pending_polls else 'PENDING'}}
+
+def _create_step(create_step):
+    return create_step(ChangeRoute53WeightsStep, fqdn={'a.example.com': 'Z1', 'b.example.com': 'Z2', 'c.example.com': 'Z1'})
+
+def test_change_weights_by_hosted_zone(create_step):
+    client = FakeRoute53Client()
+    step = _create_step(create_step)
+    change_ids = step._change_weights_by_hosted_zone(client, step.infos.fqdn, 90, 10, "test")
+    assert sorted(change_ids) == ['/change/Z1', '/change/Z2']
+    batches = dict(client.batches)
+    assert [x['ResourceRecordSet']['Name'] for x in batches['Z1']] == ['a.example.com.', 'a.example.com.', 'c.example.com.', 'c.example.com.']
+    assert [x['ResourceRecordSet']['Weight'] for x in batches['Z2']] == [90, 10]
+    assert [x['ResourceRecordSet']['SetIdentifier'] for x in batches['Z2']] == ['1', '2']
+
+def test_wait_changes_insync(sleeps, create_step):
+    client = FakeRoute53Client(pending_polls=2)
+    step = _create_step(create_step)
+    step._wait_changes_insync(client, ['/change/Z1', '/change/Z2'])
+    assert len(sleeps) == 2
+    assert client.get_change_calls.count('/change/Z1') == 3
+
+class FakeStackInventory:
+    def find(self, stack_name):
+        return {'Outputs': [{'OutputKey': 'TargetGroup1Arn', 'OutputValue': f'arn:targetgroup/{stack_name}/1'}]}
+
+class FakeCloudWatchClient:
+    def __init__(self, requests, errors):
+        self.requests = requests
+        self.errors = errors
+        self.windows = []
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime):
+        self.windows.append((EndTime - StartTime).total_seconds())
+        results = []
+        for query in MetricDataQueries:
+            release, metric, index = query['Id'].split('_')
+            values = {'requests': [self.requests[release]], 'errors': [self.errors[release]], 'latency': [0.1]}
+            results.append({'Id': query['Id'], 'Values': values[metric]})
+        return {'MetricDataResults': results}
+
+def _create_analysis_step(create_step, client, on_no_decision='rollback'):
+    step = _create_step(create_step)
+    step.infos.analysis_infos = AnalysisInfos(interval=60, on_no_decision=on_no_decision)
+    step.infos.blue_infos.stack_name = 'stage-service-1'
+    step.infos.green_infos.stack_name = 'stage-service-2'
+    step.infos.blue_infos.alb_arn = 'arn:loadbalancer/app/blue/1'
+    step.infos.green_infos.alb_arn = 'arn:loadbalancer/app/green/2'
+    step.infos._stack_inventory = FakeStackInventory()
+    step._client = lambda service_name: client
+    return step
+
+def test_analyze_canary_promote_before_wait(sleeps, create_step):
+    client = FakeCloudWatchClient({'green': 200, 'blue': 1000}, {'green': 0, 'blue': 10})
+    step = _create_analysis_step(create_step, client)
+    step._analyze_canary(300)
+    assert sleeps == [60]
+    # the window starts when the weights are propagated
+    assert client.windows == [60]
+
+def test_analyze_canary_rollback(sleeps, create_step):
+    step = _create_analysis_step(create_step, FakeCloudWatchClient({'green': 200, 'blue': 1000}, {'green': 20, 'blue': 10}))
+    with pytest.raises(ValueError):
+        step._analyze_canary(300)
+    assert sleeps == [60]
+
+def test_analyze_canary_no_decision(sleeps, create_step):
+    client = FakeCloudWatchClient({'green': 10, 'blue': 1000}, {'green': 0, 'blue': 10})
+    step = _create_analysis_step(create_step, client)
+    with pytest.raises(ValueError):
+        step._analyze_canary(180)
+    assert sleeps == [60, 60, 60]
+    assert client.windows == [60, 120, 180]
+
+def test_analyze_canary_no_decision_promote(sleeps, create_step):
+    step = _create_analysis_step(create_step, FakeCloudWatchClient({'green': 10, 'blue': 1000}, {'green': 0, 'blue': 10}), on_no_decision='promote')
+    step._analyze_canary(180)
+    assert sum(sleeps) == 180
+
+def test_analyze_canary_wait_shorter_than_period(sleeps, create_step):
+    client = FakeCloudWatchClient({'green': 200, 'blue': 1000}, {'green': 0, 'blue': 10})
+    step = _create_analysis_step(create_step, client)
+    step._analyze_canary(40)
+    assert client.windows == [60]
+
+def test_is_canary_analyzed(create_step):
+    step = _create_analysis_step(create_step, None)
+    assert step._is_canary_analyzed(90, 10)
+    assert not step._is_canary_analyzed(0, 100)
+    step.infos.analysis_infos = None
+    assert not step._is_canary_analyzed(90, 10)
+
+class FakeHealthClient:
+    def __init__(self, states):
+        self.states = states
+        self.describe_stacks_calls = 0
+
+    def describe_stacks(self, StackName):
+        self.describe_stacks_calls += 1
+        return {'Stacks': [{'Outputs': [
+            {'OutputKey': 'TargetGroup1Arn', 'OutputValue': 'arn:targetgroup/1'},
+            {'OutputKey': 'TargetGroup2Arn', 'OutputValue': 'arn:targetgroup/2'},
+            {'OutputKey': 'ServiceArn', 'OutputValue': 'arn:service'}
+        ]}]}
+
+    def describe_target_health(self, TargetGroupArn):
+        return {'TargetHealthDescriptions': [{'TargetHealth': {'State': x}} for x in self.states[TargetGroupArn]]}
+
+def _create_health_step(create_step, states, desired=2, health_infos=None):
+    client = FakeHealthClient(states)
+    step = create_step(CheckGreenHealthStep, scale_infos=ScaleInfos(desired=desired), health_infos=health_infos or HealthInfos())
+    step._client = lambda service_name: client
+    return step, client
+
+def test_is_healthy(create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy', 'healthy'],
+        'arn:targetgroup/2': ['healthy', 'healthy', 'draining']
+    })
+    assert step._is_healthy()
+    assert step._is_healthy()
+    assert client.describe_stacks_calls == 1
+    assert [x['OutputValue'] for x in step.infos.green_infos.target_group_arns] == ['arn:targetgroup/1', 'arn:targetgroup/2']
+
+def test_is_healthy_partial_fleet(create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy', 'healthy'],
+        'arn:targetgroup/2': ['healthy', 'unhealthy']
+    })
+    assert not step._is_healthy()
+
+def test_is_healthy_not_all_registered(create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy'],
+        'arn:targetgroup/2': ['healthy']
+    })
+    assert not step._is_healthy()
+
+def test_to_target_group_health(create_step):
+    step, client = _create_health_step(create_step, {})
+    descriptions = [{'TargetHealth': {'State': x}} for x in ['healthy', 'initial', 'unhealthy', 'draining', 'healthy']]
+    assert step._to_target_group_health(descriptions) == {'total': 5, 'healthy': 2, 'unhealthy': 1, 'draining': 1}
+
+def test_is_healthy_min_healthy_ratio(create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy', 'healthy', 'healthy', 'unhealthy'],
+        'arn:targetgroup/2': ['healthy', 'healthy', 'healthy', 'initial']
+    }, desired=4, health_infos=HealthInfos(min_healthy_ratio=0.75))
+    assert step._is_healthy()
+
+def test_is_converged_consecutive_healthy(sleeps, create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy', 'healthy'],
+        'arn:targetgroup/2': ['healthy', 'healthy']
+    }, health_infos=HealthInfos(consecutive_healthy=3, interval=2, backoff=2, max_interval=5))
+    step._poll(step._is_converged, 'test', step.polling_infos)
+    assert len(sleeps) == 2
+    assert sleeps[0] == pytest.approx(2, rel=0.1)
+    assert sleeps[1] == pytest.approx(4, rel=0.1)
+
+def test_is_converged_timeout(sleeps, create_step):
+    step, client = _create_health_step(create_step, {
+        'arn:targetgroup/1': ['healthy', 'unhealthy'],
+        'arn:targetgroup/2': ['healthy', 'healthy']
+    }, health_infos=HealthInfos(timeout=30))
+    with pytest.raises(ValueError):
+        step._poll(step._is_converged, 'test', step.polling_infos)
+    assert sum(sleeps) == pytest.approx(30)
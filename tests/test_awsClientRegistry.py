@@ -0,0 +1,18 @@
+import pytest
+
+from ecs_crd.awsClientRegistry import AwsClientRegistry
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+
+def test_client_is_shared_by_service_and_region():
+    registry = AwsClientRegistry()
+    client = registry.client('ecs', 'eu-west-3')
+    assert registry.client('ecs', 'eu-west-3') is client
+    assert registry.client('ecs', 'eu-west-1') is not client
+    assert registry.client('elbv2', 'eu-west-3') is not client
+    assert client.meta.config.max_pool_connections == 25
+
+def test_infos_registry_is_not_serialized():
+    infos = CanaryReleaseInfos(action='test', region='eu-west-3')
+    assert infos.aws_clients is infos.aws_clients
+    assert 'aws_clients' not in infos._checkpoint_state()
+    assert '_aws_clients' not in infos._checkpoint_state()
@@ -0,0 +1,96 @@
+import pytest
+import datetime
+
+from ecs_crd.canaryAnalysis import CanaryAnalysis
+from ecs_crd.canaryReleaseInfos import AnalysisInfos
+
+GREEN_ALB = 'arn:aws:elasticloadbalancing:eu-west-3:123456789:loadbalancer/app/green/1'
+BLUE_ALB = 'arn:aws:elasticloadbalancing:eu-west-3:123456789:loadbalancer/app/blue/2'
+
+class FakeCloudWatchClient:
+    """local stand-in returning canned get_metric_data values by release and metric"""
+
+    def __init__(self, values, page_size=4):
+        self.values = values
+        self.page_size = page_size
+        self.queries = []
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime, NextToken=None):
+        self.queries.extend([] if NextToken else MetricDataQueries)
+        start = int(NextToken) if NextToken else 0
+        end = start + self.page_size
+        results = []
+        for query in MetricDataQueries[start:end]:
+            release, metric, index = query['Id'].split('_')
+            results.append({'Id': query['Id'], 'Values': self.values[release][metric][int(index)]})
+        response = {'MetricDataResults': results}
+        if end < len(MetricDataQueries):
+            response['NextToken'] = str(end)
+        return response
+
+def _targets():
+    return {
+        'green': [(GREEN_ALB, 'arn:aws:elasticloadbalancing:eu-west-3:123456789:targetgroup/green-1/a'),
+                  (GREEN_ALB, 'arn:aws:elasticloadbalancing:eu-west-3:123456789:targetgroup/green-2/b')],
+        'blue': [(BLUE_ALB, 'arn:aws:elasticloadbalancing:eu-west-3:123456789:targetgroup/blue-1/c')]
+    }
+
+def test_fetch():
+    client = FakeCloudWatchClient({
+        'green': {'requests': [[100, 50], [30]], 'errors': [[1], [0, 1]], 'latency': [[0.2, 0.4], []]},
+        'blue': {'requests': [[900]], 'errors': [[9]], 'latency': [[0.3]]}
+    })
+    analysis = CanaryAnalysis(client, AnalysisInfos())
+    end = datetime.datetime(2020, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+    metrics = analysis.fetch(_targets(), end - datetime.timedelta(seconds=300), end)
+    assert metrics['green'] == {'requests': 180, 'errors': 2, 'latency_p99': 0.4}
+    assert metrics['blue'] == {'requests': 900, 'errors': 9, 'latency_p99': 0.3}
+    dimensions = client.queries[0]['MetricStat']['Metric']['Dimensions']
+    assert dimensions == [
+        {'Name': 'LoadBalancer', 'Value': 'app/green/1'},
+        {'Name': 'TargetGroup', 'Value': 'targetgroup/green-1/a'}
+    ]
+    assert client.queries[2]['MetricStat']['Stat'] == 'p99'
+
+def _metrics(requests, errors, latency_p99):
+    return {'requests': requests, 'errors': errors, 'latency_p99': latency_p99}
+
+def test_decide_promote():
+    analysis = CanaryAnalysis(None, AnalysisInfos())
+    decision, reason = analysis.decide(_metrics(200, 2, 0.3), _metrics(1000, 10, 0.3))
+    assert decision == CanaryAnalysis.PROMOTE
+
+def test_decide_hold():
+    analysis = CanaryAnalysis(None, AnalysisInfos(min_requests=100))
+    decision, reason = analysis.decide(_metrics(20, 0, 0.3), _metrics(1000, 10, 0.3))
+    assert decision == CanaryAnalysis.HOLD
+
+def test_decide_rollback_error_rate():
+    analysis = CanaryAnalysis(None, AnalysisInfos(max_error_rate_increase=0.01))
+    decision, reason = analysis.decide(_metrics(200, 10, 0.3), _metrics(1000, 10, 0.3))
+    assert decision == CanaryAnalysis.ROLLBACK
+    assert '5xx' in reason
+
+def test_decide_rollback_latency():
+    analysis = CanaryAnalysis(None, AnalysisInfos(max_latency_ratio=1.5))
+    decision, reason = analysis.decide(_metrics(200, 0, 0.5), _metrics(1000, 0, 0.3))
+    assert decision == CanaryAnalysis.ROLLBACK
+    assert 'latency' in reason
+
+def test_decide_without_blue_latency():
+    analysis = CanaryAnalysis(None, AnalysisInfos())
+    decision, reason = analysis.decide(_metrics(200, 0, 0.5), _metrics(0, 0, None))
+    assert decision == CanaryAnalysis.PROMOTE
+
+def test_analyze_window_start():
+    analysis = CanaryAnalysis(None, AnalysisInfos(window=300))
+    windows = []
+    def fetch(targets, start, end):
+        windows.append((start, end))
+        return {'green': _metrics(200, 0, 0.3), 'blue': _metrics(1000, 10, 0.3)}
+    analysis.fetch = fetch
+    end = datetime.datetime(2020, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+    analysis.analyze(_targets(), end=end)
+    analysis.analyze(_targets(), end=end, start=end - datetime.timedelta(seconds=120))
+    analysis.analyze(_targets(), end=end, start=end - datetime.timedelta(seconds=600))
+    assert [(end - x).total_seconds() for x, y in windows] == [300, 120, 300]
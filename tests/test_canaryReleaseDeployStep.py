@@ -0,0 +1,95 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import PollingInfos
+from ecs_crd.canaryReleaseInfos import FqdnInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.finishDeploymentStep import FinishDeploymentStep
+from ecs_crd.prepareDeploymentScaleParametersStep import PrepareDeploymentScaleParametersStep
+
+logger = logging.Logger('mock')
+infos = CanaryReleaseInfos(action='test')
+step = FinishDeploymentStep(infos, logger)
+
+def test_poll_backoff(clock):
+    results = iter([None, None, None, None, 'ok'])
+    polling_infos = PollingInfos(interval=2, backoff=2, max_interval=10, jitter=0, timeout=100)
+    assert step._poll(lambda: next(results), 'test', polling_infos) == 'ok'
+    assert clock.sleeps == [2, 4, 8, 10]
+
+def test_poll_jitter(clock):
+    results = iter([None, None, None, 'ok'])
+    polling_infos = PollingInfos(interval=10, backoff=1, max_interval=10, jitter=0.5, timeout=100)
+    step._poll(lambda: next(results), 'test', polling_infos)
+    assert all(5 <= x <= 15 for x in clock.sleeps)
+
+def test_poll_timeout(clock):
+    polling_infos = PollingInfos(interval=4, backoff=1, max_interval=4, jitter=0, timeout=10)
+    with pytest.raises(ValueError):
+        step._poll(lambda: False, 'test', polling_infos)
+    assert clock.sleeps == [4, 4, 2]
+    assert step._poll(lambda: False, 'test', polling_infos, raise_on_timeout=False) == False
+
+def test_wait(clock):
+    step._wait(60, 'test', tick=15)
+    assert clock.sleeps == [15, 15, 15, 15]
+
+def test_process_polling():
+    infos = CanaryReleaseInfos(action='test')
+    infos.configuration = DeploymentConfiguration({'canary': {'polling': {'interval': 2, 'timeout': 600}}})
+    step = PrepareDeploymentScaleParametersStep(infos, logger)
+    step._process_polling()
+    assert infos.polling_infos.interval == 2
+    assert infos.polling_infos.timeout == 600
+    assert infos.polling_infos.backoff == PollingInfos().backoff
+
+@pytest.mark.parametrize('polling', [
+    {'backoff': 0.5},
+    {'interval': 0},
+    {'max_interval': 0},
+    {'interval': 10, 'max_interval': 5},
+    {'interval': True},
+    {'timeout': '60'},
+    {'timeout': 0}
+])
+def test_process_polling_invalid(polling):
+    infos = CanaryReleaseInfos(action='test')
+    infos.configuration = DeploymentConfiguration({'canary': {'polling': polling}})
+    step = PrepareDeploymentScaleParametersStep(infos, logger)
+    with pytest.raises(ValueError):
+        step._process_polling()
+
+def test_run_concurrently():
+    assert step._run_concurrently([lambda: 1, lambda: 2, lambda: 3]) == [1, 2, 3]
+    assert step._run_concurrently([]) == []
+
+def test_run_concurrently_first_error():
+    calls = []
+    def fail(message):
+        calls.append(message)
+        raise ValueError(message)
+    with pytest.raises(ValueError, match='first'):
+        step._run_concurrently([lambda: fail('first'), lambda: fail('second'), lambda: 3])
+    assert sorted(calls) == ['first', 'second']
+
+def test_bind_data():
+    infos = CanaryReleaseInfos(action='test', environment='stage', region='eu-west-3')
+    step = FinishDeploymentStep(infos, logger)
+    assert step._bind_data('{{environment}}-{{name}}') == 'stage-{{name}}'
+    infos.service_name = 'service'
+    infos.fqdn.append(FqdnInfos(name='service.stage.example.com'))
+    assert step._bind_data('{{environment}}-{{name}}') == 'stage-service'
+    assert step._bind_data('https://{{fqdn[0]}}') == 'https://service.stage.example.com'
+    assert step._bind_data('') is None
+    with pytest.raises(ValueError):
+        step._bind_data('{{unknown}}')
+
+def test_process_property_default():
+    source = {'name': 'service'}
+    target = {}
+    step._process_property(source=source, target=target, source_property='network_mode', default='awsvpc')
+    assert target['NetworkMode'] == 'awsvpc'
+    assert 'network_mode' not in source
+    with pytest.raises(ValueError):
+        step._process_property(source=source, target=target, source_property='cpu', type=int, default='1024')
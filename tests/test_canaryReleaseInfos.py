@@ -0,0 +1,44 @@
+import pytest
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import ReleaseInfos
+from ecs_crd.canaryReleaseInfos import FqdnInfos
+from ecs_crd.canaryReleaseInfos import ScaleInfos
+from ecs_crd.canaryReleaseInfos import StrategyInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.applyStrategyStep import CheckGreenHealthStep
+from ecs_crd.cli import _find_step_class
+
+def test_load_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    infos = CanaryReleaseInfos(action='deploy', environment='stage', region='eu-west-3')
+    infos.configuration = DeploymentConfiguration({'canary': {'group': 'private'}})
+    infos.green_infos.stack_id = 'green-stack-id'
+    infos.blue_infos = ReleaseInfos(alb_dns='blue.elb.amazonaws.com', canary_release='1')
+    infos.fqdn.append(FqdnInfos(name='api.example.com', hosted_zone_id='/hostedzone/Z1'))
+    infos.scale_infos = ScaleInfos(desired=3)
+    infos.strategy_infos.append(StrategyInfos(weight=50, wait=60))
+    infos.last_step = 'CheckGreenHealthStep'
+    infos.save(force=True)
+
+    result = CanaryReleaseInfos.load(infos.id)
+    assert result.id == infos.id
+    assert result.action == 'deploy'
+    assert result.last_step == 'CheckGreenHealthStep'
+    assert result.green_infos.stack_id == 'green-stack-id'
+    assert result.green_infos.stack == infos.green_infos.stack
+    assert result.blue_infos.alb_dns == 'blue.elb.amazonaws.com'
+    assert result.fqdn[0].hosted_zone_id == '/hostedzone/Z1'
+    assert result.scale_infos.desired == 3
+    assert result.strategy_infos[0].weight == 50
+    assert result.configuration['canary']['group'] == 'private'
+
+def test_load_unknown_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        CanaryReleaseInfos.load('unknown')
+
+def test_find_step_class():
+    assert _find_step_class('CheckGreenHealthStep') == CheckGreenHealthStep
+    with pytest.raises(ValueError):
+        _find_step_class('UnknownStep')
@@ -0,0 +1,43 @@
+import pytest
+
+from ecs_crd.certificateIndex import CertificateIndex
+
+class FakeAcmClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = 0
+
+    def list_certificates(self, NextToken=None):
+        self.calls += 1
+        index = int(NextToken) if NextToken else 0
+        response = {'CertificateSummaryList': self.pages[index]}
+        if index + 1 < len(self.pages):
+            response['NextToken'] = str(index + 1)
+        return response
+
+def _certificate(id, domain_name, sans=None):
+    result = {'CertificateArn': f'arn:certificate/{id}', 'DomainName': domain_name}
+    if sans:
+        result['SubjectAlternativeNameSummaries'] = sans
+    return result
+
+def test_load_pagination():
+    client = FakeAcmClient([[_certificate(1, 'a.example.com')], [_certificate(2, 'b.example.com')]])
+    index = CertificateIndex.load(client)
+    assert client.calls == 2
+    assert index.find('b.example.com')[0]['CertificateArn'] == 'arn:certificate/2'
+
+def test_find():
+    index = CertificateIndex([
+        _certificate(1, 'example.com', ['example.com', 'www.example.com']),
+        _certificate(2, '*.example.com'),
+        _certificate(3, 'api.example.com'),
+        _certificate(4, 'api.example.com')
+    ])
+    assert [x['CertificateArn'] for x in index.find('www.example.com')] == ['arn:certificate/1']
+    assert [x['CertificateArn'] for x in index.find('Example.com')] == ['arn:certificate/1']
+    assert [x['CertificateArn'] for x in index.find('api.example.com')] == ['arn:certificate/3', 'arn:certificate/4']
+    assert [x['CertificateArn'] for x in index.find('service.example.com')] == ['arn:certificate/2']
+    assert [x['CertificateArn'] for x in index.find('*.example.com')] == ['arn:certificate/2']
+    assert index.find('a.b.example.com') == []
+    assert index.find('example.org') == []
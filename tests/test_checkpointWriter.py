@@ -0,0 +1,64 @@
+import pytest
+import os
+
+from ecs_crd.checkpointWriter import CheckpointWriter
+from ecs_crd.canaryReleaseInfos import StackInfos
+
+def test_write_only_when_changed(tmp_path):
+    writer = CheckpointWriter(str(tmp_path))
+    state = {'id': 'a', 'stack': StackInfos(stack_name='s')}
+    assert writer.write(state)
+    assert not writer.write(state)
+    state['stack'].stack_id = 'id'
+    assert writer.write(state)
+    data = CheckpointWriter.read(str(tmp_path))
+    assert data['stack']['stack_id'] == 'id'
+    assert not os.path.exists(writer.filename + '.tmp')
+
+def test_private_properties_are_not_written(tmp_path):
+    writer = CheckpointWriter(str(tmp_path))
+    stack = StackInfos(stack_name='s')
+    stack._runtime = object()
+    writer.write({'stack': stack})
+    assert CheckpointWriter.read(str(tmp_path)) == {'stack': {'stack_id': None, 'stack_name': 's', 'stack': None}}
+
+def test_debounce(tmp_path):
+    writer = CheckpointWriter(str(tmp_path), min_interval=3600)
+    state = {'exit_code': 0}
+    assert writer.write(state)
+    state['exit_code'] = 1
+    assert not writer.write(state)
+    assert CheckpointWriter.read(str(tmp_path))['exit_code'] == 0
+    assert writer.flush()
+    assert CheckpointWriter.read(str(tmp_path))['exit_code'] == 1
+    state['exit_code'] = 2
+    assert writer.write(state, force=True)
+    assert CheckpointWriter.read(str(tmp_path))['exit_code'] == 2
+
+def test_jsonl_delta(tmp_path):
+    writer = CheckpointWriter(str(tmp_path), format='jsonl')
+    state = {'a': 1, 'b': {'c': [1, 2]}, 'd': None}
+    writer.write(state)
+    state['a'] = 2
+    writer.write(state)
+    del state['d']
+    writer.write(state)
+    with open(writer.filename) as file:
+        lines = file.readlines()
+    assert len(lines) == 3
+    assert '"b"' not in lines[1]
+    assert CheckpointWriter.read(str(tmp_path)) == {'a': 2, 'b': {'c': [1, 2]}}
+
+def test_jsonl_torn_line(tmp_path):
+    writer = CheckpointWriter(str(tmp_path), format='jsonl')
+    state = {'a': 1}
+    writer.write(state)
+    state['a'] = 2
+    writer.write(state)
+    with open(writer.filename, 'a') as file:
+        file.write('{"set":{"a":')
+    assert CheckpointWriter.read(str(tmp_path)) == {'a': 2}
+
+def test_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        CheckpointWriter(str(tmp_path), format='xml')
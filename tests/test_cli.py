@@ -0,0 +1,100 @@
+import pytest
+import logging
+
+from click.testing import CliRunner
+
+from ecs_crd.canaryReleaseDeployStep import CanaryReleaseDeployStep
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import ReleaseInfos
+from ecs_crd.canaryReleaseInfos import StrategyInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.applyStrategyStep import ChangeRoute53WeightsStep
+from ecs_crd.rollbackChangeRoute53WeightsStep import RollbackChangeRoute53WeightsStep
+from ecs_crd.cli import main
+from ecs_crd.cli import _run_steps
+
+logger = logging.Logger('mock')
+
+class SaveStep(CanaryReleaseDeployStep):
+    resumable = False
+
+    def __init__(self, infos, logger, fail=False):
+        super().__init__(infos, 'Save', logger)
+        self.fail = fail
+
+    def _on_execute(self):
+        self.infos.service_name = 'first'
+        self.infos.save()
+        # debounced (less than min_interval after the previous write)
+        self.infos.service_name = 'last'
+        self.infos.save()
+        if self.fail:
+            raise KeyboardInterrupt()
+        return None
+
+def test_run_steps_flush(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    infos = CanaryReleaseInfos(action='deploy')
+    _run_steps(infos, SaveStep(infos, logger))
+    assert CanaryReleaseInfos.load(infos.id).service_name == 'last'
+
+def test_run_steps_flush_on_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    infos = CanaryReleaseInfos(action='deploy')
+    with pytest.raises(KeyboardInterrupt):
+        _run_steps(infos, SaveStep(infos, logger, fail=True))
+    assert CanaryReleaseInfos.load(infos.id).service_name == 'last'
+
+class Calls:
+    def __init__(self):
+        self.weights = []
+        self.rollbacks = 0
+        self.kill_rollback = True
+
+@pytest.fixture
+def calls(monkeypatch):
+    result = Calls()
+    def change_weights(step, strategy):
+        result.weights.append(strategy.weight)
+        raise ValueError('green is not healthy')
+    def rollback_weights(step, client):
+        result.rollbacks += 1
+        if result.kill_rollback:
+            # the CI runner is killed during the rollback
+            raise KeyboardInterrupt()
+    monkeypatch.setattr(ChangeRoute53WeightsStep, '_change_weights', change_weights)
+    monkeypatch.setattr(RollbackChangeRoute53WeightsStep, '_rollback_weights', rollback_weights)
+    monkeypatch.setattr(RollbackChangeRoute53WeightsStep, '_client', lambda step, service_name: None)
+    return result
+
+def _create_infos():
+    infos = CanaryReleaseInfos(action='deploy', environment='stage', region='eu-west-3')
+    infos.configuration = DeploymentConfiguration({'canary': {'group': 'private'}})
+    infos.blue_infos = ReleaseInfos(stack_id='blue-stack-id', canary_release='1')
+    infos.strategy_infos.append(StrategyInfos(weight=50, wait=60))
+    return infos
+
+def test_resume_killed_during_rollback(tmp_path, monkeypatch, calls):
+    monkeypatch.chdir(tmp_path)
+    infos = _create_infos()
+    with pytest.raises(KeyboardInterrupt):
+        _run_steps(infos, ChangeRoute53WeightsStep(infos, logger))
+    checkpoint = CanaryReleaseInfos.load(infos.id)
+    assert checkpoint.last_step == 'RollbackChangeRoute53WeightsStep'
+    assert checkpoint.exit_code == 5
+    assert checkpoint.exit_exception == 'green is not healthy'
+
+    calls.kill_rollback = False
+    result = CliRunner().invoke(main, ['resume', '--id', infos.id])
+    assert result.exit_code == 5
+    # the weights are not shifted again to green, the rollback is done again
+    assert calls.weights == [50]
+    assert calls.rollbacks == 2
+    checkpoint = CanaryReleaseInfos.load(infos.id)
+    assert checkpoint.last_step == 'FinishDeploymentStep'
+    assert checkpoint.exit_code == 5
+
+    # a finished deployment is not resumed
+    result = CliRunner().invoke(main, ['resume', '--id', infos.id])
+    assert result.exit_code == 5
+    assert calls.rollbacks == 2
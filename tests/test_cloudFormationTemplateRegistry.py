@@ -0,0 +1,41 @@
+import pytest
+import json
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.cloudFormationTemplateRegistry import CloudFormationTemplateRegistry
+
+def test_bundled_templates():
+    registry = CloudFormationTemplateRegistry()
+    assert 'green' in registry.names()
+    assert 'init' in registry.names()
+
+def test_get_returns_independent_copies():
+    registry = CloudFormationTemplateRegistry()
+    a = registry.get('green')
+    b = registry.get('green')
+    a['Parameters']['Environment']['Default'] = 'stage'
+    a['Resources']['TaskDefinition']['Properties']['ContainerDefinitions'].append({})
+    assert b['Parameters']['Environment'].get('Default') != 'stage'
+    assert registry.get('green') == b
+    assert isinstance(b['Resources']['TaskDefinition']['Properties']['ContainerDefinitions'], list)
+
+def test_infos_do_not_share_templates():
+    infos1 = CanaryReleaseInfos(action='test')
+    infos2 = CanaryReleaseInfos(action='test')
+    infos1.green_infos.stack['Parameters']['ProjectName']['Default'] = 'project'
+    assert infos2.green_infos.stack['Parameters']['ProjectName'].get('Default') != 'project'
+
+def test_register_directory(tmp_path):
+    template = {'Parameters': {'Environment': {}, 'Region': {}}, 'Resources': {}}
+    (tmp_path / 'cfn_green_release_deploy.json').write_text(json.dumps(template))
+    (tmp_path / 'cfn_worker_release_deploy.json').write_text(json.dumps(template))
+    registry = CloudFormationTemplateRegistry()
+    registry.register_directory(str(tmp_path))
+    assert registry.get('green') == template
+    assert registry.get('worker') == template
+    assert 'init' in registry.names()
+
+def test_unknown_template():
+    registry = CloudFormationTemplateRegistry()
+    with pytest.raises(ValueError):
+        registry.get('unknown')
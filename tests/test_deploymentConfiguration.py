@@ -0,0 +1,45 @@
+import pytest
+import logging
+import json
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.prepareDeploymentScaleParametersStep import PrepareDeploymentScaleParametersStep
+from ecs_crd.prepareDeploymentStrategyStep import PrepareDeploymentStrategyStep
+
+logger = logging.Logger('mock')
+
+def test_load_configuration(tmp_path):
+    filename = tmp_path / 'stage.deploy.yml'
+    filename.write_text('canary:\n  group: private\n  scale:\n    desired: 3\n')
+    configuration = DeploymentConfiguration.load(str(filename))
+    assert configuration['canary']['group'] == 'private'
+    assert configuration['canary']['scale']['desired'] == 3
+    assert configuration.configuration_file == str(filename)
+
+def test_configuration_is_loaded_once_per_run(tmp_path):
+    filename = tmp_path / 'stage.deploy.yml'
+    filename.write_text('canary:\n  group: private\n')
+    infos = CanaryReleaseInfos(action='test', configuration_file=str(filename))
+    step1 = PrepareDeploymentScaleParametersStep(infos, logger)
+    # a file edited during the run must not be seen by the next steps
+    filename.write_text('canary:\n  group: public\n')
+    step2 = PrepareDeploymentStrategyStep(infos, logger)
+    assert step1.configuration is step2.configuration
+    assert step2.configuration['canary']['group'] == 'private'
+
+def test_configuration_is_read_only():
+    data = {'canary': {'group': 'private', 'releases': ['blue', 'green']}}
+    configuration = DeploymentConfiguration(data)
+    with pytest.raises(TypeError):
+        configuration['service'] = {}
+    with pytest.raises(TypeError):
+        configuration['canary']['group'] = 'public'
+    with pytest.raises(TypeError):
+        configuration['canary'].setdefault('scale', {})
+    with pytest.raises(TypeError):
+        configuration['canary']['releases'].append('red')
+    # the configuration is a copy of the data
+    data['canary']['group'] = 'public'
+    assert configuration['canary']['group'] == 'private'
+    assert json.loads(json.dumps(configuration)) == {'canary': {'group': 'private', 'releases': ['blue', 'green']}}
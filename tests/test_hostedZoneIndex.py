@@ -0,0 +1,38 @@
+import pytest
+
+from ecs_crd.hostedZoneIndex import HostedZoneIndex
+
+class FakeRoute53Client:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def list_hosted_zones_by_name(self, DNSName=None, HostedZoneId=None):
+        self.calls.append(DNSName)
+        index = int(HostedZoneId) if HostedZoneId else 0
+        response = {'HostedZones': self.pages[index], 'IsTruncated': index + 1 < len(self.pages)}
+        if response['IsTruncated']:
+            response['NextDNSName'] = self.pages[index + 1][0]['Name']
+            response['NextHostedZoneId'] = str(index + 1)
+        return response
+
+def _zone(id, name):
+    return {'Id': f'/hostedzone/{id}', 'Name': name}
+
+def test_load_pagination():
+    client = FakeRoute53Client([[_zone('Z1', 'example.com.')], [_zone('Z2', 'stage.example.com.')]])
+    index = HostedZoneIndex.load(client)
+    assert client.calls == [None, 'stage.example.com.']
+    assert index.find('service.stage.example.com')['Id'] == '/hostedzone/Z2'
+
+def test_find_longest_suffix():
+    index = HostedZoneIndex([_zone('Z1', 'example.com.'), _zone('Z2', 'stage.example.com.'), _zone('Z3', 'example.co.uk.')])
+    assert index.find('service.stage.example.com')['Id'] == '/hostedzone/Z2'
+    assert index.find('service.prod.example.com.')['Id'] == '/hostedzone/Z1'
+    assert index.find('service.example.co.uk')['Id'] == '/hostedzone/Z3'
+    assert index.find('Example.com')['Id'] == '/hostedzone/Z1'
+    assert index.find('service.example.org') is None
+
+def test_find_same_name():
+    index = HostedZoneIndex([_zone('Z1', 'example.com.'), _zone('Z2', 'example.com.')])
+    assert index.find('service.example.com')['Id'] == '/hostedzone/Z1'
@@ -0,0 +1,44 @@
+import pytest
+
+from ecs_crd.listenerRulePriorityAllocator import ListenerRulePriorityAllocator
+
+def test_allocate_lowest_gap():
+    allocator = ListenerRulePriorityAllocator([3, 4, 6, 10])
+    assert allocator.allocate() == 5
+    assert allocator.allocate() == 7
+    assert allocator.used == [3, 4, 5, 6, 7, 10]
+
+def test_allocate_min_priority():
+    assert ListenerRulePriorityAllocator().allocate() == 3
+    assert ListenerRulePriorityAllocator([1, 2]).allocate() == 3
+
+def test_reserve_range():
+    allocator = ListenerRulePriorityAllocator([3, 5, 6, 9, 12])
+    assert allocator.reserve_range(2) == [7, 8]
+    assert allocator.reserve_range(3) == [13, 14, 15]
+    assert allocator.reserve_range(1) == [4]
+    assert allocator.reserve_range(0) == []
+
+def test_reserve_range_full():
+    allocator = ListenerRulePriorityAllocator([3, 4], max_priority=5)
+    assert allocator.allocate() == 5
+    with pytest.raises(ValueError):
+        allocator.allocate()
+
+def test_use():
+    allocator = ListenerRulePriorityAllocator([3])
+    allocator.use(4)
+    allocator.use('4')
+    assert allocator.used == [3, 4]
+    assert allocator.allocate() == 5
+
+def test_fragmentation():
+    assert ListenerRulePriorityAllocator().fragmentation() == 0
+    assert ListenerRulePriorityAllocator([3, 4, 5]).fragmentation() == 0
+    assert ListenerRulePriorityAllocator([3, 6]).fragmentation() == 0.5
+
+def test_deterministic():
+    def allocate():
+        allocator = ListenerRulePriorityAllocator([10, 3, 7, 4])
+        return [allocator.reserve_range(2), allocator.allocate(), allocator.allocate()]
+    assert allocate() == allocate() == [[5, 6], 8, 9]
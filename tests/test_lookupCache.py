@@ -0,0 +1,29 @@
+import pytest
+
+from ecs_crd.lookupCache import LookupCache
+
+def test_get():
+    cache = LookupCache()
+    calls = []
+    def factory():
+        calls.append(1)
+        return 'value'
+    assert cache.get(('vpc', '1'), factory) == 'value'
+    assert cache.get(('vpc', '1'), factory) == 'value'
+    assert len(calls) == 1
+
+def test_get_error_not_cached():
+    cache = LookupCache()
+    def fail():
+        raise ValueError('not found')
+    with pytest.raises(ValueError):
+        cache.get('key', fail)
+    assert cache.get('key', lambda: 'value') == 'value'
+
+def test_invalidate():
+    cache = LookupCache()
+    cache.get('key', lambda: 'value')
+    cache.invalidate('key')
+    assert cache.get('key', lambda: 'other') == 'other'
+    cache.clear()
+    assert cache.get('key', lambda: 'last') == 'last'
@@ -0,0 +1,40 @@
+import pytest
+
+from ecs_crd.placeholderTemplate import PlaceholderTemplate
+from ecs_crd.placeholderTemplate import compile_template
+
+context = {
+    'environment': 'stage',
+    'name': 'service',
+    'version': None,
+    'fqdn': ('service.stage.example.com', 'api.stage.example.com')
+}
+
+def test_tokens():
+    template = PlaceholderTemplate('{{environment}}-{{name}}:{{fqdn[1]}}')
+    assert template.tokens == [
+        ('environment', None, '{{environment}}'), '-', ('name', None, '{{name}}'), ':', ('fqdn', 1, '{{fqdn[1]}}')]
+
+def test_render():
+    assert compile_template('{{environment}}-{{name}}').render(context) == 'stage-service'
+    assert compile_template('https://{{fqdn}}/{{fqdn[1]}}').render(context) == 'https://service.stage.example.com/api.stage.example.com'
+    assert compile_template('no template').render(context) == 'no template'
+
+def test_render_without_value():
+    assert compile_template('{{name}}:{{version}}').render(context) == 'service:{{version}}'
+
+def test_render_other_syntax():
+    assert compile_template('{{.Name}}/{{ .ID }}').render(context) == '{{.Name}}/{{ .ID }}'
+
+def test_render_unknown():
+    with pytest.raises(ValueError, match='Unknown template'):
+        compile_template('{{environement}}-{{name}}').render(context)
+
+def test_render_invalid_fqdn():
+    with pytest.raises(ValueError, match='Invalid Fqdn template'):
+        compile_template('{{fqdn[2]}}').render(context)
+    with pytest.raises(ValueError):
+        compile_template('{{name[1]}}').render(context)
+
+def test_compile_template_cache():
+    assert compile_template('{{name}}.example.com') is compile_template('{{name}}.example.com')
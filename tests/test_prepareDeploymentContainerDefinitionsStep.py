@@ -5,6 +5,8 @@ import logging
 from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
 from ecs_crd.prepareDeploymentContainerDefinitionsStep import PrepareDeploymentContainerDefinitionsStep
 from ecs_crd.canaryReleaseInfos import ScaleInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.lookupCache import lookup_cache
 
 logger = logging.Logger('mock')
 infos = CanaryReleaseInfos(action='test')
@@ -192,4 +194,131 @@ def test_process_container_hostname_valid():
     
     step._process_container_hostname(source, target)
     assert target['Hostname'] ==  source['hostname']
-    
\ No newline at end of file
+    
+class ImageNotFoundException(Exception):
+    pass
+
+class FakeEcrClient:
+    class exceptions:
+        ImageNotFoundException = ImageNotFoundException
+
+    def __init__(self, images):
+        self.images = images
+        self.calls = []
+
+    def describe_images(self, repositoryName, imageIds):
+        self.calls.append((repositoryName, [x['imageTag'] for x in imageIds]))
+        details = []
+        for x in imageIds:
+            digest = self.images.get((repositoryName, x['imageTag']))
+            if not digest:
+                raise ImageNotFoundException(x['imageTag'])
+            details.append({'imageDigest': digest, 'imageTags': [x['imageTag']]})
+        return {'imageDetails': details}
+
+def _create_ecr_step(client, containers):
+    infos = CanaryReleaseInfos(action='test')
+    infos.account_id = '123456789'
+    infos.region = 'eu-west-3'
+    infos.configuration = DeploymentConfiguration({'service': {'containers': containers}})
+    step = PrepareDeploymentContainerDefinitionsStep(infos, logger)
+    step._client = lambda service_name: client
+    return step
+
+def test_parse_ecr_image():
+    assert step._parse_ecr_image('123456789.dkr.ecr.eu-west-3.amazonaws.com/service:1.0.0') == ('service', '1.0.0')
+    assert step._parse_ecr_image('123456789.dkr.ecr.eu-west-3.amazonaws.com/team/service:1.0.0') == ('team/service', '1.0.0')
+    assert step._parse_ecr_image('123456789.dkr.ecr.eu-west-3.amazonaws.com/team/service') == ('team/service', 'latest')
+
+def test_prefetch_container_images():
+    registry = '123456789.dkr.ecr.eu-west-3.amazonaws.com'
+    client = FakeEcrClient({('app', '1.0.0'): 'sha256:a', ('app', 'envoy'): 'sha256:b', ('team/agent', '2'): 'sha256:c'})
+    step = _create_ecr_step(client, [
+        {'image': f'{registry}/app:1.0.0'},
+        {'image': f'{registry}/app:envoy'},
+        {'image': f'{registry}/team/agent:2'},
+        {'image': 'amazon/aws-for-fluent-bit:latest'}
+    ])
+    step._prefetch_container_images()
+    assert sorted(client.calls) == [('app', ['1.0.0', 'envoy']), ('team/agent', ['2'])]
+    assert step._find_container_image_digest(f'{registry}/app:envoy') == 'sha256:b'
+    assert len(client.calls) == 2
+
+def test_prefetch_container_images_unknown_tag():
+    registry = '123456789.dkr.ecr.eu-west-3.amazonaws.com'
+    client = FakeEcrClient({('app', '1.0.0'): 'sha256:a'})
+    step = _create_ecr_step(client, [{'image': f'{registry}/app:1.0.0'}, {'image': f'{registry}/app:unknown'}])
+    step._prefetch_container_images()
+    assert step._find_container_image_digest(f'{registry}/app:1.0.0') == 'sha256:a'
+    assert step._find_container_image_digest(f'{registry}/app:unknown') is None
+    with pytest.raises(ValueError):
+        step._process_container_image({'image': f'{registry}/app:unknown'}, {})
+
+def test_process_container_image_pin_digest():
+    registry = '123456789.dkr.ecr.eu-west-3.amazonaws.com'
+    client = FakeEcrClient({('app', '1.0.0'): 'sha256:a'})
+    step = _create_ecr_step(client, [])
+    target = {}
+    step._process_container_image({'image': f'{registry}/app:1.0.0', 'pin_image_digest': True}, target)
+    assert target['Image'] == f'{registry}/app@sha256:a'
+
+class FakeSecretsManagerClient:
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.calls = []
+
+    def describe_secret(self, SecretId):
+        self.calls.append(SecretId)
+        if SecretId not in self.secrets:
+            raise Exception('ResourceNotFoundException')
+        return self.secrets[SecretId]
+
+class FakeKmsClient:
+    def __init__(self):
+        self.calls = []
+
+    def describe_key(self, KeyId, GrantTokens):
+        self.calls.append(KeyId)
+        return {'KeyMetadata': {'Arn': f'arn:aws:kms:eu-west-3:123456789:key/{KeyId}'}}
+
+def _create_secrets_step(clients, containers):
+    lookup_cache.clear()
+    infos = CanaryReleaseInfos(action='test', environment='stage')
+    infos.account_id = '123456789'
+    infos.region = 'eu-west-3'
+    infos.configuration = DeploymentConfiguration({'service': {'containers': containers}})
+    step = PrepareDeploymentContainerDefinitionsStep(infos, logger)
+    step._client = lambda service_name: clients[service_name]
+    return step
+
+def test_find_secrets_task_informations():
+    secrets = FakeSecretsManagerClient({
+        'stage/db': {'ARN': 'arn:secret:stage/db', 'KmsKeyId': 'key-1'},
+        'stage/api': {'ARN': 'arn:secret:stage/api', 'KmsKeyId': 'key-1'},
+        "stage/it's": {'ARN': 'arn:secret:stage/its'}
+    })
+    kms = FakeKmsClient()
+    step = _create_secrets_step({'secretsmanager': secrets, 'kms': kms}, [
+        {'secrets': [{'DB': '{{environment}}/db'}, {'API': 'stage/api'}]},
+        {'secrets': [{'DB': 'stage/db'}, {'QUOTE': "stage/it's"}]}
+    ])
+    result = step._find_secrets_task_informations()
+    assert sorted(secrets.calls) == ["stage/api", "stage/db", "stage/it's"]
+    assert [x['id'] for x in result.secrets] == ['stage/db', 'stage/api', "stage/it's"]
+    assert result.secrets_arn == ['arn:secret:stage/db', 'arn:secret:stage/api', 'arn:secret:stage/its']
+    assert result.kms_arn == ['arn:aws:kms:eu-west-3:123456789:key/key-1']
+    # the arns are cached by account and region
+    step._find_secrets_task_informations()
+    assert len(secrets.calls) == 3
+    assert len(kms.calls) == 1
+
+def test_find_secrets_task_informations_none():
+    step = _create_secrets_step({}, [{'name': 'default'}])
+    assert step._find_secrets_task_informations() is None
+
+def test_find_secrets_task_informations_invalid():
+    step = _create_secrets_step({'secretsmanager': FakeSecretsManagerClient({}), 'kms': FakeKmsClient()}, [
+        {'secrets': [{'DB': 'stage/unknown'}]}
+    ])
+    with pytest.raises(ValueError):
+        step._find_secrets_task_informations()
@@ -0,0 +1,122 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import FqdnInfos
+from ecs_crd.deploymentConfiguration import DeploymentConfiguration
+from ecs_crd.lookupCache import lookup_cache
+from ecs_crd.prepareDeploymentGlobalParametersStep import PrepareDeploymentGlobalParametersStep
+from ecs_crd.prepareDeploymentLoadBalancerParametersStep import PrepareDeploymentLoadBalancerParametersStep
+
+logger = logging.Logger('mock')
+
+def _create_step():
+    infos = CanaryReleaseInfos(action='test', environment='stage')
+    infos.configuration = DeploymentConfiguration({
+        'canary': {'group': 'internal'},
+        'service': {'project': 'project', 'name': 'service', 'version': '1.0.0', 'fqdn': ['{{name}}.stage.example.com']}
+    })
+    step = PrepareDeploymentGlobalParametersStep(infos, logger)
+    step._find_account_id = lambda: '123456789'
+    step._find_external_ip = lambda: '1.2.3.4'
+    step._find_vpc_Id = lambda: 'vpc-1'
+    step._to_fqdn_infos = lambda source: FqdnInfos(name=step._bind_data(source), hosted_zone_name='example.com', hosted_zone_id='Z1')
+    step._find_cluster = lambda name: f'arn:aws:ecs:eu-west-3:123456789:cluster/{name}'
+    step._create_dynamodb_table = lambda: None
+    infos.save = lambda force=False: None
+    return step
+
+def test_on_execute():
+    step = _create_step()
+    assert isinstance(step._on_execute(), PrepareDeploymentLoadBalancerParametersStep)
+    assert step.infos.account_id == '123456789'
+    assert step.infos.external_ip == '1.2.3.4'
+    assert step.infos.vpc_id == 'vpc-1'
+    assert step.infos.fqdn[0].name == 'service.stage.example.com'
+    assert step.infos.cluster_name == 'stage-ecs-cluster'
+    assert step.infos.cluster == 'arn:aws:ecs:eu-west-3:123456789:cluster/stage-ecs-cluster'
+
+def test_on_execute_lookup_error():
+    step = _create_step()
+    def fail(name):
+        raise ValueError(f'Cluster "{name}" not found.')
+    step._find_cluster = fail
+    step._on_execute()
+    assert step.infos.exit_code == 1
+    assert 'not found' in str(step.infos.exit_exception)
+
+class FakeEc2Client:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def describe_vpcs(self, Filters, NextToken=None):
+        self.calls.append(Filters)
+        index = int(NextToken) if NextToken else 0
+        response = {'Vpcs': self.pages[index]}
+        if index + 1 < len(self.pages):
+            response['NextToken'] = str(index + 1)
+        return response
+
+def test_find_vpc_id():
+    lookup_cache.clear()
+    client = FakeEc2Client([[], [{'VpcId': 'vpc-2'}]])
+    step = PrepareDeploymentGlobalParametersStep(CanaryReleaseInfos(action='test', environment='stage'), logger)
+    step.infos.account_id = '123456789'
+    step._client = lambda service_name: client
+    assert step._find_vpc_Id() == 'vpc-2'
+    assert client.calls[0] == [{'Name': 'tag:Environment', 'Values': ['stage']}]
+    assert step._find_vpc_Id() == 'vpc-2'
+    assert len(client.calls) == 2
+
+def test_find_vpc_id_not_found():
+    lookup_cache.clear()
+    step = PrepareDeploymentGlobalParametersStep(CanaryReleaseInfos(action='test', environment='stage'), logger)
+    step._client = lambda service_name: FakeEc2Client([[]])
+    with pytest.raises(ValueError):
+        step._find_vpc_Id()
+
+class FakeEcsClient:
+    def __init__(self, clusters, pages):
+        self.clusters = clusters
+        self.pages = pages
+        self.describe_calls = 0
+        self.list_calls = 0
+
+    def describe_clusters(self, clusters):
+        self.describe_calls += 1
+        return {'clusters': [x for x in self.clusters if x['clusterName'] == clusters[0]], 'failures': []}
+
+    def list_clusters(self, nextToken=None):
+        self.list_calls += 1
+        index = int(nextToken) if nextToken else 0
+        response = {'clusterArns': self.pages[index]}
+        if index + 1 < len(self.pages):
+            response['nextToken'] = str(index + 1)
+        return response
+
+def _create_cluster_step(client):
+    lookup_cache.clear()
+    step = PrepareDeploymentGlobalParametersStep(CanaryReleaseInfos(action='test', environment='stage'), logger)
+    step.infos.account_id = '123456789'
+    step._client = lambda service_name: client
+    return step
+
+def test_find_cluster():
+    arn = 'arn:aws:ecs:eu-west-3:123456789:cluster/stage-ecs-cluster'
+    client = FakeEcsClient([{'clusterName': 'stage-ecs-cluster', 'clusterArn': arn, 'status': 'ACTIVE'}], [])
+    step = _create_cluster_step(client)
+    assert step._find_cluster('stage-ecs-cluster') == arn
+    assert step._find_cluster('stage-ecs-cluster') == arn
+    assert client.describe_calls == 1
+    assert client.list_calls == 0
+
+def test_find_cluster_fallback_listing():
+    arn = 'arn:aws:ecs:eu-west-3:123456789:cluster/stage-ecs-cluster'
+    client = FakeEcsClient([], [['arn:aws:ecs:eu-west-3:123456789:cluster/other'], [arn]])
+    step = _create_cluster_step(client)
+    assert step._find_cluster('stage-ecs-cluster') == arn
+    assert client.list_calls == 2
+    with pytest.raises(ValueError):
+        step._find_cluster('unknown')
+    assert client.list_calls == 2
@@ -0,0 +1,49 @@
+import pytest
+import logging
+
+from ecs_crd.albTopology import AlbTopology
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import ListenerRuleInfos
+from ecs_crd.prepareDeploymentListenersStep import PrepareDeploymentListenersStep
+
+logger = logging.Logger('mock')
+
+class FakeElbv2Client:
+    def __init__(self, priorities):
+        self.priorities = priorities
+
+    def describe_rules(self, ListenerArn):
+        return {'Rules': [{'Priority': x} for x in self.priorities]}
+
+def test_find_priority_allocator():
+    infos = CanaryReleaseInfos(action='test')
+    infos.green_infos.alb_arn = 'arn:alb/1'
+    infos._alb_topologies['arn:alb/1'] = AlbTopology(FakeElbv2Client(['3', '4', '7', 'default']), 'arn:alb/1')
+    infos.listener_rules_infos = [
+        ListenerRuleInfos(listener_arn='arn:listener/443', configuration={'rules': [{'priority': 5}, {}]}),
+        ListenerRuleInfos(listener_arn='arn:listener/443', configuration={'rules': [{}, {}]})
+    ]
+    step = PrepareDeploymentListenersStep(infos, logger)
+    allocator = step._find_priority_allocator(infos.listener_rules_infos[0])
+    assert allocator.used == [3, 4, 5, 7]
+    assert step._find_priority_allocator(infos.listener_rules_infos[1]) is allocator
+    priorities = iter(allocator.reserve_range(1))
+    assert step._calculate_avalaible_priority_rule({'priority': 5}, priorities) == 5
+    assert step._calculate_avalaible_priority_rule({}, priorities) == 6
+    assert allocator.reserve_range(2) == [8, 9]
+
+def test_find_priorities_two_target_groups():
+    infos = CanaryReleaseInfos(action='test')
+    infos.green_infos.alb_arn = 'arn:alb/1'
+    infos._alb_topologies['arn:alb/1'] = AlbTopology(FakeElbv2Client(['3', '5', 'default']), 'arn:alb/1')
+    infos.listener_rules_infos = [
+        ListenerRuleInfos(listener_arn='arn:listener/443', configuration={'rules': [{}, {'priority': 10}]}),
+        ListenerRuleInfos(listener_arn='arn:listener/443', configuration={'rules': [{}, {}]}),
+        ListenerRuleInfos(listener_arn='arn:listener/80', configuration={'rules': [{}]})
+    ]
+    step = PrepareDeploymentListenersStep(infos, logger)
+    priorities = step._find_priorities(infos.listener_rules_infos[0])
+    # one range for the three rules without priority of the two target groups
+    assert step._find_priorities(infos.listener_rules_infos[1]) is priorities
+    assert list(priorities) == [6, 7, 8]
+    assert step._find_priority_allocator(infos.listener_rules_infos[0]).used == [3, 5, 6, 7, 8, 10]
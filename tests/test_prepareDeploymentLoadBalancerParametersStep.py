@@ -0,0 +1,86 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import ReleaseInfos
+from ecs_crd.prepareDeploymentLoadBalancerParametersStep import PrepareDeploymentLoadBalancerParametersStep
+
+logger = logging.Logger('mock')
+
+class FakeElbv2Client:
+    def __init__(self, load_balancers, tags, page_size=2):
+        self.load_balancers = load_balancers
+        self.tags = tags
+        self.page_size = page_size
+        self.describe_tags_calls = []
+
+    def describe_load_balancers(self, Marker=None):
+        start = int(Marker) if Marker else 0
+        end = start + self.page_size
+        response = {'LoadBalancers': self.load_balancers[start:end]}
+        if end < len(self.load_balancers):
+            response['NextMarker'] = str(end)
+        return response
+
+    def describe_tags(self, ResourceArns):
+        assert len(ResourceArns) <= 20
+        self.describe_tags_calls.append(ResourceArns)
+        return {'TagDescriptions': [
+            {'ResourceArn': x, 'Tags': [{'Key': k, 'Value': v} for k, v in self.tags.get(x, {}).items()]}
+            for x in ResourceArns]}
+
+def _alb(index, vpc_id='vpc-1', type='application'):
+    return {
+        'LoadBalancerArn': f'arn:alb/{index}',
+        'DNSName': f'alb-{index}.eu-west-3.elb.amazonaws.com',
+        'CanonicalHostedZoneId': 'Z1',
+        'VpcId': vpc_id,
+        'Type': type
+    }
+
+def _create_step(client):
+    infos = CanaryReleaseInfos(action='test')
+    infos.vpc_id = 'vpc-1'
+    step = PrepareDeploymentLoadBalancerParametersStep(infos, logger)
+    step._client = lambda service_name: client
+    return step
+
+def test_list_load_balancers():
+    client = FakeElbv2Client([_alb(1), _alb(2, vpc_id='vpc-2'), _alb(3, type='network'), _alb(4)], {})
+    step = _create_step(client)
+    assert [x['LoadBalancerArn'] for x in step._list_load_balancers()] == ['arn:alb/1', 'arn:alb/4']
+
+def test_index_load_balancers_by_canary_group():
+    load_balancers = [_alb(i) for i in range(45)]
+    tags = {
+        'arn:alb/3': {'CanaryGroup': 'internal', 'CanaryRelease': '1'},
+        'arn:alb/30': {'CanaryGroup': 'internal', 'CanaryRelease': '2'},
+        'arn:alb/41': {'CanaryGroup': 'external', 'CanaryRelease': '1'},
+        'arn:alb/42': {'CanaryGroup': 'external'}
+    }
+    client = FakeElbv2Client(load_balancers, tags)
+    step = _create_step(client)
+    index = step._index_load_balancers_by_canary_group(load_balancers)
+    assert len(client.describe_tags_calls) == 3
+    assert [x.arn for x in index['internal']] == ['arn:alb/3', 'arn:alb/30']
+    assert [x.canary_release for x in index['internal']] == ['1', '2']
+    assert [x.arn for x in index['external']] == ['arn:alb/41']
+
+class FakeStackInventory:
+    def __init__(self, stacks):
+        self.stacks = stacks
+
+    def find(self, stack_name):
+        return self.stacks.get(stack_name)
+
+def test_process_blue_stack_long_environment():
+    infos = CanaryReleaseInfos(action='deploy', environment='preprod', service_name='service')
+    infos.blue_infos = ReleaseInfos(canary_release='1')
+    step = PrepareDeploymentLoadBalancerParametersStep(infos, logger)
+    stack_name = step._generate_name(canary_release='1')
+    assert stack_name == 'prepr-service-1'
+    infos._stack_inventory = FakeStackInventory({stack_name: {'StackId': 'blue-stack-id', 'StackName': stack_name}})
+    step._process_blue_stack({'stack_name': stack_name})
+    assert infos.blue_infos.stack_id == 'blue-stack-id'
+    assert infos.blue_infos.stack_name == stack_name
+    assert infos.stack_inventory.find(infos.blue_infos.stack_name)
@@ -0,0 +1,38 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import HealthInfos
+from ecs_crd.prepareDeploymentScaleParametersStep import PrepareDeploymentScaleParametersStep
+
+logger = logging.Logger('mock')
+
+def test_process_health(create_step):
+    step = create_step(PrepareDeploymentScaleParametersStep, {'health': {'min_healthy_ratio': 0.5, 'consecutive_healthy': 3, 'timeout': 300}})
+    step._process_health()
+    assert step.infos.health_infos.min_healthy_ratio == 0.5
+    assert step.infos.health_infos.consecutive_healthy == 3
+    assert step.infos.health_infos.timeout == 300
+    assert step.infos.health_infos.interval == HealthInfos().interval
+
+def test_process_health_default(create_step):
+    step = create_step(PrepareDeploymentScaleParametersStep, {})
+    step._process_health()
+    assert step.infos.health_infos.__dict__ == HealthInfos().__dict__
+
+@pytest.mark.parametrize('health', [
+    {'min_healthy_ratio': 0},
+    {'min_healthy_ratio': 1.5},
+    {'min_healthy_ratio': True},
+    {'consecutive_healthy': 0},
+    {'consecutive_healthy': 1.5},
+    {'consecutive_healthy': True},
+    {'backoff': 0.5},
+    {'interval': 0},
+    {'max_interval': 0},
+    {'interval': 20, 'max_interval': 10},
+    {'timeout': 'slow'},
+    {'timeout': 0}
+])
+def test_process_health_invalid(health, create_step):
+    with pytest.raises(ValueError):
+        create_step(PrepareDeploymentScaleParametersStep, {'health': health})._process_health()
@@ -0,0 +1,40 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import AnalysisInfos
+from ecs_crd.prepareDeploymentStrategyStep import PrepareDeploymentStrategyStep
+
+logger = logging.Logger('mock')
+
+def test_process_analysis(create_step):
+    step = create_step(PrepareDeploymentStrategyStep, {'analysis': {'window': 120, 'max_latency_ratio': 2}})
+    step._process_analysis()
+    assert step.infos.analysis_infos.window == 120
+    assert step.infos.analysis_infos.max_latency_ratio == 2
+    assert step.infos.analysis_infos.min_requests == AnalysisInfos().min_requests
+
+def test_process_analysis_default(create_step):
+    step = create_step(PrepareDeploymentStrategyStep, {'analysis': None})
+    step._process_analysis()
+    assert step.infos.analysis_infos.window == AnalysisInfos().window
+    step = create_step(PrepareDeploymentStrategyStep, {})
+    step._process_analysis()
+    assert step.infos.analysis_infos is None
+
+def test_process_analysis_invalid(create_step):
+    with pytest.raises(ValueError):
+        create_step(PrepareDeploymentStrategyStep, {'analysis': {'min_requests': -1}})._process_analysis()
+    with pytest.raises(ValueError):
+        create_step(PrepareDeploymentStrategyStep, {'analysis': {'period': 90}})._process_analysis()
+    with pytest.raises(ValueError):
+        create_step(PrepareDeploymentStrategyStep, {'analysis': {'interval': 0}})._process_analysis()
+    with pytest.raises(ValueError):
+        create_step(PrepareDeploymentStrategyStep, {'analysis': {'on_no_decision': 'hold'}})._process_analysis()
+
+def test_process_analysis_on_no_decision(create_step):
+    step = create_step(PrepareDeploymentStrategyStep, {'analysis': {}})
+    step._process_analysis()
+    assert step.infos.analysis_infos.on_no_decision == 'rollback'
+    step = create_step(PrepareDeploymentStrategyStep, {'analysis': {'on_no_decision': 'promote'}})
+    step._process_analysis()
+    assert step.infos.analysis_infos.on_no_decision == 'promote'
@@ -0,0 +1,40 @@
+import pytest
+import logging
+
+from ecs_crd.rollbackChangeRoute53WeightsStep import RollbackChangeRoute53WeightsStep
+
+logger = logging.Logger('mock')
+
+class FakeRoute53Client:
+    def __init__(self, blue_weights):
+        self.blue_weights = blue_weights
+        self.batches = []
+
+    def list_resource_record_sets(self, HostedZoneId, StartRecordName, MaxItems):
+        return {'ResourceRecordSets': [
+            {'Name': f'{StartRecordName}.', 'SetIdentifier': '1', 'Weight': self.blue_weights[StartRecordName]},
+            {'Name': f'{StartRecordName}.', 'SetIdentifier': '2', 'Weight': 100 - self.blue_weights[StartRecordName]}
+        ]}
+
+    def change_resource_record_sets(self, HostedZoneId, ChangeBatch):
+        self.batches.append((HostedZoneId, ChangeBatch['Changes']))
+        return {'ChangeInfo': {'Id': f'/change/{HostedZoneId}', 'Status': 'PENDING'}}
+
+    def get_change(self, Id):
+        return {'ChangeInfo': {'Id': Id, 'Status': 'INSYNC'}}
+
+def _create_step(create_step):
+    return create_step(RollbackChangeRoute53WeightsStep, fqdn={'a.example.com': 'Z1', 'b.example.com': 'Z1', 'c.example.com': 'Z2'})
+
+def test_rollback_weights(sleeps, create_step):
+    client = FakeRoute53Client({'a.example.com': 50, 'b.example.com': 100, 'c.example.com': 0})
+    _create_step(create_step)._rollback_weights(client)
+    batches = dict(client.batches)
+    assert [x['ResourceRecordSet']['Name'] for x in batches['Z1']] == ['a.example.com.', 'a.example.com.']
+    assert [x['ResourceRecordSet']['Weight'] for x in batches['Z2']] == [100, 0]
+    assert sleeps == []
+
+def test_rollback_weights_no_change(sleeps, create_step):
+    client = FakeRoute53Client({'a.example.com': 100, 'b.example.com': 100, 'c.example.com': 100})
+    _create_step(create_step)._rollback_weights(client)
+    assert client.batches == []
@@ -0,0 +1,43 @@
+import pytest
+import logging
+
+from ecs_crd.canaryReleaseInfos import CanaryReleaseInfos
+from ecs_crd.canaryReleaseInfos import ScaleInfos
+from ecs_crd.scaleUpServiceStep import ScaleUpServiceStep
+
+logger = logging.Logger('mock')
+infos = CanaryReleaseInfos(action='test')
+infos.scale_infos = ScaleInfos(desired=2, wait=60)
+step = ScaleUpServiceStep(infos, logger)
+
+class FakeEcsClient:
+    def __init__(self, deployments):
+        self.deployments = deployments
+
+    def describe_services(self, cluster, services):
+        return {
+            'services': [{
+                'runningCount': sum(x['runningCount'] for x in self.deployments),
+                'desiredCount': self.deployments[0]['desiredCount'],
+                'deployments': self.deployments
+            }]
+        }
+
+def test_is_service_steady():
+    client = FakeEcsClient([{'status': 'PRIMARY', 'desiredCount': 2, 'runningCount': 2}])
+    assert step._is_service_steady(client, 'arn')
+
+def test_is_service_steady_tasks_not_running():
+    client = FakeEcsClient([{'status': 'PRIMARY', 'desiredCount': 2, 'runningCount': 1}])
+    assert not step._is_service_steady(client, 'arn')
+
+def test_is_service_steady_previous_deployment():
+    client = FakeEcsClient([
+        {'status': 'PRIMARY', 'desiredCount': 2, 'runningCount': 2},
+        {'status': 'ACTIVE', 'desiredCount': 1, 'runningCount': 1}
+    ])
+    assert not step._is_service_steady(client, 'arn')
+
+def test_is_service_steady_update_not_applied():
+    client = FakeEcsClient([{'status': 'PRIMARY', 'desiredCount': 1, 'runningCount': 1}])
+    assert not step._is_service_steady(client, 'arn')
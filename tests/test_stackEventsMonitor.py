@@ -0,0 +1,70 @@
+import pytest
+import logging
+
+from ecs_crd.stackEventsMonitor import StackEventsMonitor
+
+logger = logging.Logger('mock')
+STACK_ID = 'arn:aws:cloudformation:eu-west-3:123456789:stack/stage-service-1/1'
+
+def _event(id, logical_id, status, resource_type='AWS::ECS::Service'):
+    physical_id = STACK_ID if resource_type == 'AWS::CloudFormation::Stack' else f'{logical_id}-id'
+    return {
+        'EventId': id,
+        'StackId': STACK_ID,
+        'LogicalResourceId': logical_id,
+        'PhysicalResourceId': physical_id,
+        'ResourceType': resource_type,
+        'ResourceStatus': status
+    }
+
+class FakeCloudFormationClient:
+    """local stand-in returning canned describe_stack_events responses"""
+
+    def __init__(self, page_size=2):
+        self.events = []
+        self.page_size = page_size
+        self.calls = 0
+
+    def emit(self, event):
+        self.events.insert(0, event)
+
+    def describe_stack_events(self, StackName, NextToken=None):
+        self.calls += 1
+        start = int(NextToken) if NextToken else 0
+        end = start + self.page_size
+        response = {'StackEvents': self.events[start:end]}
+        if end < len(self.events):
+            response['NextToken'] = str(end)
+        return response
+
+def test_poll_returns_only_new_events():
+    client = FakeCloudFormationClient()
+    monitor = StackEventsMonitor(client, STACK_ID, logger)
+    client.emit(_event('1', 'stage-service-1', 'CREATE_IN_PROGRESS', 'AWS::CloudFormation::Stack'))
+    client.emit(_event('2', 'Service', 'CREATE_IN_PROGRESS'))
+    client.emit(_event('3', 'TargetGroup', 'CREATE_IN_PROGRESS'))
+    assert [e['EventId'] for e in monitor._find_new_events()] == ['1', '2', '3']
+    assert monitor._find_new_events() == []
+    client.emit(_event('4', 'Service', 'CREATE_COMPLETE'))
+    assert [e['EventId'] for e in monitor._find_new_events()] == ['4']
+
+def test_poll_stack_status():
+    client = FakeCloudFormationClient()
+    monitor = StackEventsMonitor(client, STACK_ID, logger)
+    client.emit(_event('1', 'stage-service-1', 'CREATE_IN_PROGRESS', 'AWS::CloudFormation::Stack'))
+    client.emit(_event('2', 'Service', 'CREATE_IN_PROGRESS'))
+    assert monitor.poll() == 'CREATE_IN_PROGRESS'
+    client.emit(_event('3', 'Service', 'CREATE_COMPLETE'))
+    assert monitor.poll() == 'CREATE_IN_PROGRESS'
+    client.emit(_event('4', 'stage-service-1', 'CREATE_COMPLETE', 'AWS::CloudFormation::Stack'))
+    assert monitor.poll() == 'CREATE_COMPLETE'
+
+def test_mark_ignores_previous_events():
+    client = FakeCloudFormationClient()
+    client.emit(_event('1', 'stage-service-1', 'CREATE_IN_PROGRESS', 'AWS::CloudFormation::Stack'))
+    client.emit(_event('2', 'stage-service-1', 'CREATE_COMPLETE', 'AWS::CloudFormation::Stack'))
+    monitor = StackEventsMonitor(client, STACK_ID, logger)
+    assert monitor.mark() == 'CREATE_COMPLETE'
+    assert monitor._find_new_events() == []
+    client.emit(_event('3', 'stage-service-1', 'DELETE_IN_PROGRESS', 'AWS::CloudFormation::Stack'))
+    assert monitor.poll() == 'DELETE_IN_PROGRESS'
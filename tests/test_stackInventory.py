@@ -0,0 +1,49 @@
+import pytest
+
+from botocore.exceptions import ClientError
+from ecs_crd.stackInventory import StackInventory
+
+class FakeCloudFormationClient:
+    def __init__(self, stacks):
+        self.stacks = stacks
+        self.calls = []
+
+    def describe_stacks(self, StackName):
+        self.calls.append(StackName)
+        if StackName not in self.stacks:
+            error = {'Error': {'Code': 'ValidationError', 'Message': f'Stack with id {StackName} does not exist'}}
+            raise ClientError(error, 'DescribeStacks')
+        return {'Stacks': [self.stacks[StackName]]}
+
+def test_find():
+    client = FakeCloudFormationClient({'stage-service-0': {'StackId': 'id-0', 'StackStatus': 'CREATE_COMPLETE'}})
+    inventory = StackInventory(client)
+    assert inventory.find('stage-service-0')['StackId'] == 'id-0'
+    assert inventory.find('stage-service-0')['StackId'] == 'id-0'
+    assert client.calls == ['stage-service-0']
+
+def test_find_not_exist():
+    client = FakeCloudFormationClient({})
+    inventory = StackInventory(client)
+    assert inventory.find('stage-service-1') is None
+    assert inventory.find('stage-service-1') is None
+    assert len(client.calls) == 1
+
+def test_find_other_status():
+    client = FakeCloudFormationClient({'stage-service-1': {'StackId': 'id-1', 'StackStatus': 'ROLLBACK_COMPLETE'}})
+    assert StackInventory(client).find('stage-service-1') is None
+
+def test_forget():
+    client = FakeCloudFormationClient({})
+    inventory = StackInventory(client)
+    assert inventory.find('stage-service-1') is None
+    client.stacks['stage-service-1'] = {'StackId': 'id-1', 'StackStatus': 'CREATE_COMPLETE'}
+    inventory.forget('stage-service-1')
+    assert inventory.find('stage-service-1')['StackId'] == 'id-1'
+
+def test_error():
+    class FailingClient:
+        def describe_stacks(self, StackName):
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'DescribeStacks')
+    with pytest.raises(ClientError):
+        StackInventory(FailingClient()).find('stage-service-1')